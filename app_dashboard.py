@@ -4,17 +4,20 @@ Clean, modern interface for evaluating AI model performance
 """
 
 import streamlit as st
-import pandas as pd
-import plotly.graph_objects as go
-import plotly.express as px
 from pathlib import Path
-import json
+import bisect
+import hashlib
+import html
+import math
+from operator import itemgetter
+import re
 import sys
 
-# Add pipeline to path
+# Add pipeline to path; the calculators (and the pandas stack
+# behind them) are imported on first analysis, not on the welcome screen
 sys.path.append(str(Path(__file__).parent / 'pipeline'))
-from kappa_calculator import KappaCalculator
-from model_evaluator import ModelEvaluator
+
+from json_utils import json_loads
 
 # Page config
 st.set_page_config(
@@ -24,218 +27,239 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Custom CSS for modern, dark mode look
-st.markdown("""
-<style>
-    /* Import modern premium font */
-    @import url('https://fonts.googleapis.com/css2?family=Plus+Jakarta+Sans:wght@400;500;600;700;800&display=swap');
-    
-    * {
-        font-family: 'Plus Jakarta Sans', sans-serif;
-    }
-    
-    /* Global background and base text */
-    .stApp {
-        font-size: 13px;
-        background: linear-gradient(180deg, #0f172a 0%, #020617 100%) !important;
-        color: #f8fafc;
-    }
-    
-    /* High-contrast solid background for visibility */
-    .glass-card {
-        background: rgba(10, 15, 28, 0.95) !important;
-        backdrop-filter: blur(16px) !important;
-        -webkit-backdrop-filter: blur(16px) !important;
-        border: 1px solid rgba(255, 255, 255, 0.2) !important;
-        border-radius: 12px !important;
-        box-shadow: 0 10px 40px 0 rgba(0, 0, 0, 0.6) !important;
-    }
+# Custom CSS for modern, dark mode look. The stylesheet lives in
+# static/dashboard.css; with static serving enabled (.streamlit/config.toml)
+# the browser fetches and caches it, otherwise it is inlined minified.
+_CSS_PATH = Path(__file__).parent / 'static' / 'dashboard.css'
+_CSS_LINK = '<link rel="stylesheet" href="app/static/dashboard.css">'
 
-    /* Remove header white bar */
-    header, [data-testid="stHeader"] {
-        background-color: transparent !important;
-    }
-    
-    /* Top decoration bar */
-    [data-testid="stDecoration"] {
-        background: linear-gradient(90deg, #6366f1 0%, #a855f7 50%, #ec4899 100%) !important;
-        height: 4px !important;
-    }
-    
-    .subtitle {
-        text-align: center;
-        color: #ffffff !important; /* Pure white */
-        font-size: 0.95rem;
-        margin-bottom: 1.5rem;
-        font-weight: 500;
-        letter-spacing: 0.01em;
-    }
-    
-    .section-header {
-        font-size: 1.3rem;
-        font-weight: 900;
-        color: #ffffff !important;
-        margin-top: 1.5rem;
-        margin-bottom: 1rem;
-        padding-bottom: 0.5rem;
-        border-bottom: 2px solid rgba(255, 255, 255, 0.4);
-        text-transform: uppercase;
-        letter-spacing: 0.08em;
-    }
-    
-    /* Metric styling with ABSOLUTE CONTRAST */
-    div[data-testid="stMetric"], 
-    div[data-testid="stMetricValue"], 
-    div[data-testid="stMetricLabel"] {
-        background-color: rgba(5, 10, 20, 0.98) !important;
-        border-radius: 12px !important;
-    }
+@st.cache_resource
+def _css():
+    """Return the dashboard stylesheet as a <style> block, minified once per server process."""
+    css = _CSS_PATH.read_text(encoding='utf-8')
+    # Strip comments and collapse whitespace so the per-rerun delta stays small
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    return f'<style>{css.strip()}</style>'
 
-    div[data-testid="stMetric"] {
-        padding: 0.75rem !important;
-        border: 1px solid rgba(255, 255, 255, 0.3) !important;
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.5) !important;
-    }
-    
-    /* Target ALL possible metric text elements */
-    div[data-testid="stMetric"] *, 
-    [data-testid="stMetricValue"] *,
-    [data-testid="metric-container"] * {
-        color: #ffffff !important;
-        -webkit-text-fill-color: #ffffff !important;
-    }
+def _stylesheet():
+    """Markup that applies the dashboard stylesheet on this rerun."""
+    if st.get_option('server.enableStaticServing'):
+        return _CSS_LINK
+    return _css()
 
-    /* Except for the delta colors which should remain visible */
-    div[data-testid="stMetricDelta"] * {
-        -webkit-text-fill-color: initial !important;
-    }
-    
-    div[data-testid="stMetricValue"] {
-        font-size: 2.2rem !important;
-        font-weight: 900 !important;
-    }
+_DIGEST_CHUNK = 64 * 1024
 
-    div[data-testid="stMetricLabel"] p {
-        font-size: 0.95rem !important;
-        font-weight: 800 !important;
-        text-transform: uppercase !important;
-    }
-    
-    /* Sidebar styling with ultra-bright text */
-    [data-testid="stSidebar"] {
-        background: rgba(10, 15, 28, 1.0) !important;
-        border-right: 1px solid rgba(255, 255, 255, 0.15);
-    }
-    
-    [data-testid="stSidebar"] *, 
-    [data-testid="stSidebarCollapse"] * {
-        color: #ffffff !important;
-        font-weight: 600 !important;
-    }
-    
-    /* File uploader visibility - Reverted to white text on subtler background */
-    [data-testid="stFileUploader"] * {
-        color: #ffffff !important;
-    }
-    
-    [data-testid="stFileUploader"] section {
-        background: rgba(255, 255, 255, 0.05) !important;
-        border: 1px dashed rgba(255, 255, 255, 0.3) !important;
-    }
-    
-    /* Uploaded file list */
-    [data-testid="stUploadedFile"] * {
-        color: #ffffff !important;
-    }
-    
-    /* Info cards styling with near-total opacity */
-    .info-card {
-        background: rgba(10, 15, 28, 0.98) !important;
-        backdrop-filter: blur(12px);
-        padding: 1.25rem;
-        border-radius: 12px;
-        border: 1px solid rgba(255, 255, 255, 0.2);
-        margin: 1rem 0;
-    }
-    
-    .info-card h3 {
-        color: #ffffff !important;
-        font-weight: 800;
-        margin-bottom: 0.75rem;
-    }
+def _upload_digest(uploaded_files):
+    """Content hash of an upload set (order-sensitive, as annotators are numbered by position).
 
-    /* Alert box refinements */
-    .stAlert {
-        background: rgba(10, 15, 28, 0.95) !important;
-        backdrop-filter: blur(8px);
-        border: 1px solid rgba(255, 255, 255, 0.3) !important;
-    }
-    
-    /* Universal white for all interactive sub-elements */
-    .stAlert *, .stCaption, [data-testid="stCaptionContainer"] {
-        color: #ffffff !important;
-        font-weight: 600 !important;
-    }
-</style>
-""", unsafe_allow_html=True)
+    Files are streamed through the hash in fixed-size chunks, so no copy of
+    the upload is made just to key the caches.
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    for f in uploaded_files:
+        # Length prefix keeps file boundaries part of the hash
+        digest.update(f.size.to_bytes(8, 'little'))
+        f.seek(0)
+        for chunk in iter(lambda: f.read(_DIGEST_CHUNK), b''):
+            digest.update(chunk)
+        f.seek(0)
+    return digest.hexdigest()
+
+# The cached phases are keyed on the upload digest; the underscore-prefixed
+# file argument is excluded from Streamlit's argument hashing. Results stay in
+# memory only: they embed the uploaded feedback (raw_data) and would not notice
+# changes to the pipeline code if persisted across restarts.
+@st.cache_resource(show_spinner=False, max_entries=32)
+def _parse_feedback(digest, _uploaded_files):
+    """Parse uploaded feedback files once; the dicts are shared read-only by both phases."""
+    return [json_loads(f.getvalue()) for f in _uploaded_files]
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _run_iaa(digest, _uploaded_files):
+    """Run Phase 3 (IAA), cached on the uploaded file contents."""
+    from kappa_calculator import KappaCalculator
+    return KappaCalculator().calculate_agreement_from_records(_parse_feedback(digest, _uploaded_files))
+
+@st.cache_data(show_spinner=False, max_entries=32)
+def _run_eval(digest, _uploaded_files):
+    """Run Phase 4 (model evaluation), cached on the uploaded file contents."""
+    from model_evaluator import ModelEvaluator
+    return ModelEvaluator().evaluate_model_from_records(_parse_feedback(digest, _uploaded_files))
+
+# Score bands for interpret_score: _SCORE_LABELS[i] covers scores in
+# [_SCORE_THRESHOLDS[i - 1], _SCORE_THRESHOLDS[i])
+_SCORE_THRESHOLDS = (0.40, 0.60, 0.75, 0.90)
+_SCORE_LABELS = (
+    ("Poor", "#d63031"),
+    ("Needs Improvement", "#f5576c"),
+    ("Fair", "#f5a623"),
+    ("Good", "#11998e"),
+    ("Excellent", "#38ef7d")
+)
 
 def interpret_score(score):
     """Interpret agreement/accuracy score with user-friendly language."""
     if score is None:
         return "Not Available", "gray"
-    elif score >= 0.90:
-        return "Excellent", "#38ef7d"
-    elif score >= 0.75:
-        return "Good", "#11998e"
-    elif score >= 0.60:
-        return "Fair", "#f5a623"
-    elif score >= 0.40:
-        return "Needs Improvement", "#f5576c"
+    if score != score:
+        # NaN fails every threshold, so it lands in the lowest band
+        return _SCORE_LABELS[0]
+    return _SCORE_LABELS[bisect.bisect_right(_SCORE_THRESHOLDS, score)]
+
+def metric_grid(metrics):
+    """Render (label, value, delta, help) tuples as a single HTML grid of metric cards."""
+    cards = []
+    for label, value, delta, help_text in metrics:
+        title = f' title="{html.escape(help_text)}"' if help_text else ''
+        delta_html = f'<div class="metric-delta">{delta}</div>' if delta else ''
+        cards.append(
+            f'<div class="metric-card"{title}>'
+            f'<div class="metric-label">{label}</div>'
+            f'<div class="metric-value">{value}</div>'
+            f'{delta_html}'
+            '</div>'
+        )
+    return f'<div class="metric-grid">{"".join(cards)}</div>'
+
+def section_intro(title, caption):
+    """Section header and caption as one HTML block."""
+    return (
+        f'<h2 class="section-header">{title}</h2>'
+        f'<p class="section-caption">{caption}</p>'
+    )
+
+def score_list(title, category_scores, weak=False):
+    """Render (category, score) pairs as one HTML list of alert-style items."""
+    item_class = 'score-item weak' if weak else 'score-item'
+    items = ''.join(
+        f'<div class="{item_class}"><strong>{html.escape(cat.title())}</strong> ({score*100:.0f}%)</div>'
+        for cat, score in category_scores
+    )
+    return f'<div class="score-list"><strong>{title}</strong>{items}</div>'
+
+# Shared Plotly chart config: skip mounting the mode bar toolbar on every chart
+_PLOTLY_CONFIG = {'displayModeBar': False}
+
+# Figure builders are st.cache_resource, so every rerun gets the same
+# go.Figure back. st.plotly_chart serializes a Figure directly, whereas a
+# dict would be copied out of st.cache_data and re-validated into a new
+# Figure on each call. Treat the returned figures as read-only.
+
+def _apply_theme(fig):
+    """Apply the shared dark-mode layout (transparent background, white text)."""
+    fig.update_layout(
+        paper_bgcolor='rgba(0,0,0,0)',
+        plot_bgcolor='rgba(0,0,0,0)',
+        font={'color': '#ffffff'}
+    )
+    return fig
+
+# Render gauges as inline SVG; flip to True to use the Plotly indicator gauges
+USE_PLOTLY_GAUGES = False
+
+# Score bands shared by the SVG and Plotly gauges
+_GAUGE_STEPS = [
+    {'range': [0, 40], 'color': 'rgba(239, 68, 68, 0.1)'},
+    {'range': [40, 60], 'color': 'rgba(245, 158, 11, 0.1)'},
+    {'range': [60, 75], 'color': 'rgba(234, 179, 8, 0.1)'},
+    {'range': [75, 90], 'color': 'rgba(34, 197, 94, 0.1)'},
+    {'range': [90, 100], 'color': 'rgba(16, 185, 129, 0.1)'}
+]
+
+# Invariant parts of the Plotly gauge; create_score_gauge only fills in the
+# value, title and target (plotly copies these on construction)
+_GAUGE_NUMBER = {'suffix': "%", 'font': {'size': 36, 'color': '#ffffff'}}
+_GAUGE_BASE = {
+    'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "#334155"},
+    'bar': {'color': "#6366f1", 'thickness': 0.8},
+    'bgcolor': "rgba(30, 41, 59, 0.5)",
+    'borderwidth': 0,
+    'steps': _GAUGE_STEPS
+}
+_GAUGE_THRESHOLD = {'line': {'color': "#ec4899", 'width': 3}, 'thickness': 0.8}
+_GAUGE_LAYOUT = {
+    'height': 140,
+    'margin': dict(l=15, r=15, t=30, b=10),
+    'font': {'family': 'Plus Jakarta Sans, sans-serif'}
+}
+
+def score_gauge_html(score_value, title, target=0.75):
+    """Create a lightweight semicircle gauge as inline SVG (no Plotly.js mount)."""
+    value = score_value * 100 if score_value else 0
+    fill = min(max(value, 0), 100)
+    arc = 'd="M 10 50 A 40 40 0 0 1 90 50" pathLength="100" fill="none"'
+    
+    bands = ''.join(
+        f'<path {arc} stroke="{step["color"]}" stroke-width="12" '
+        f'stroke-dasharray="0 {step["range"][0]} {step["range"][1] - step["range"][0]} 100"/>'
+        for step in _GAUGE_STEPS
+    )
+    
+    # Target marker: a short radial tick across the arc
+    angle = math.pi * target
+    tick = ' '.join(
+        f'x{i}="{50 - r * math.cos(angle):.2f}" y{i}="{50 - r * math.sin(angle):.2f}"'
+        for i, r in ((1, 33), (2, 47))
+    )
+    
+    return (
+        '<div class="score-gauge">'
+        f'<div class="score-gauge-title">{title}</div>'
+        '<svg viewBox="0 0 100 56" role="img">'
+        f'<path {arc} stroke="rgba(30, 41, 59, 0.5)" stroke-width="12"/>'
+        f'{bands}'
+        f'<path {arc} stroke="#6366f1" stroke-width="9" stroke-dasharray="{fill:.2f} 100"/>'
+        f'<line {tick} stroke="#ec4899" stroke-width="1.5"/>'
+        f'<text x="50" y="48" text-anchor="middle">{value:.1f}%</text>'
+        '</svg>'
+        '</div>'
+    )
+
+def render_score_gauge(score_value, title, target=0.75):
+    """Write a score gauge to the current container."""
+    if USE_PLOTLY_GAUGES:
+        st.plotly_chart(create_score_gauge(score_value, title, target=target), width="stretch", config=_PLOTLY_CONFIG)
     else:
-        return "Poor", "#d63031"
+        st.markdown(score_gauge_html(score_value, title, target=target), unsafe_allow_html=True)
 
+@st.cache_resource(show_spinner=False, max_entries=64)
 def create_score_gauge(score_value, title, target=0.75):
-    """Create a modern gauge chart for scores (dark mode)."""
+    """Create a modern gauge chart for scores (dark mode), as a shared cached figure."""
+    import plotly.graph_objects as go
+    
     fig = go.Figure(go.Indicator(
         mode="gauge+number",
         value=score_value * 100 if score_value else 0,
         domain={'x': [0, 1], 'y': [0, 1]},
         title={'text': title, 'font': {'size': 14, 'color': '#ffffff'}},
-        number={'suffix': "%", 'font': {'size': 36, 'color': '#ffffff'}},
+        number=_GAUGE_NUMBER,
         gauge={
-            'axis': {'range': [0, 100], 'tickwidth': 1, 'tickcolor': "#334155"},
-            'bar': {'color': "#6366f1", 'thickness': 0.8},
-            'bgcolor': "rgba(30, 41, 59, 0.5)",
-            'borderwidth': 0,
-            'steps': [
-                {'range': [0, 40], 'color': 'rgba(239, 68, 68, 0.1)'},
-                {'range': [40, 60], 'color': 'rgba(245, 158, 11, 0.1)'},
-                {'range': [60, 75], 'color': 'rgba(234, 179, 8, 0.1)'},
-                {'range': [75, 90], 'color': 'rgba(34, 197, 94, 0.1)'},
-                {'range': [90, 100], 'color': 'rgba(16, 185, 129, 0.1)'}
-            ],
-            'threshold': {
-                'line': {'color': "#ec4899", 'width': 3},
-                'thickness': 0.8,
-                'value': target * 100
-            }
+            **_GAUGE_BASE,
+            'threshold': {**_GAUGE_THRESHOLD, 'value': target * 100}
         }
     ))
-    fig.update_layout(
-        height=140,
-        margin=dict(l=15, r=15, t=30, b=10),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font={'family': 'Plus Jakarta Sans, sans-serif', 'color': '#ffffff'}
-    )
-    return fig
+    fig.update_layout(**_GAUGE_LAYOUT)
+    return _apply_theme(fig)
 
 def create_confusion_matrix_heatmap(cm_data, category):
     """Create confusion matrix heatmap (dark mode)."""
     matrix = cm_data['matrix']
+    return _build_confusion_matrix_fig(
+        matrix['positive_positive'], matrix['positive_negative'],
+        matrix['negative_positive'], matrix['negative_negative'],
+        category
+    )
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _build_confusion_matrix_fig(pos_pos, pos_neg, neg_pos, neg_neg, category):
+    """Cached heatmap builder keyed on the four cell counts."""
+    import plotly.graph_objects as go
     
-    z = [[matrix['positive_positive'], matrix['positive_negative']],
-         [matrix['negative_positive'], matrix['negative_negative']]]
+    z = [[pos_pos, pos_neg],
+         [neg_pos, neg_neg]]
     
     # Create custom text with better visibility
     text = [[f"<b>{val}</b>" for val in row] for row in z]
@@ -267,28 +291,35 @@ def create_confusion_matrix_heatmap(cm_data, category):
         ),
         height=240,
         margin=dict(l=20, r=20, t=40, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font={'color': '#ffffff', 'family': 'Inter, sans-serif'}
+        font={'family': 'Inter, sans-serif'}
     )
-    return fig
+    return _apply_theme(fig)
 
 def create_category_comparison(category_scores, metric_name):
     """Create bar chart comparing categories (dark mode)."""
-    df = pd.DataFrame([
-        {'Category': cat, metric_name: score * 100}
-        for cat, score in category_scores.items()
-        if score is not None
-    ])
+    # Items tuple keeps the category order and makes the cache key hashable
+    return _build_category_comparison_fig(tuple(category_scores.items()), metric_name)
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _build_category_comparison_fig(category_items, metric_name):
+    """Cached bar chart builder keyed on (category, score) pairs."""
+    import plotly.graph_objects as go
     
-    fig = px.bar(
-        df,
-        x='Category',
-        y=metric_name,
-        color=metric_name,
-        color_continuous_scale=[[0, '#1e293b'], [1, '#a855f7']],
-        range_color=[0, 100]
-    )
+    categories = [cat for cat, score in category_items if score is not None]
+    values = [score * 100 for cat, score in category_items if score is not None]
+    
+    # Plain go.Bar (no Plotly Express wrapper); bars keep the value-scaled colour
+    fig = go.Figure(go.Bar(
+        x=categories,
+        y=values,
+        marker={
+            'color': values,
+            'colorscale': [[0, '#1e293b'], [1, '#a855f7']],
+            'cmin': 0,
+            'cmax': 100
+        },
+        hovertemplate=f'%{{x}}<br>{metric_name}: %{{y:.1f}}%<extra></extra>'
+    ))
     
     fig.update_layout(
         title={
@@ -300,12 +331,9 @@ def create_category_comparison(category_scores, metric_name):
         yaxis_range=[0, 105],
         height=220,
         margin=dict(l=10, r=10, t=40, b=20),
-        paper_bgcolor='rgba(0,0,0,0)',
-        plot_bgcolor='rgba(0,0,0,0)',
-        font={'color': '#ffffff', 'size': 11},
+        font={'size': 11},
         xaxis={'gridcolor': 'rgba(255,255,255,0.2)', 'tickfont': {'size': 11, 'color': '#ffffff'}},
         yaxis={'gridcolor': 'rgba(255,255,255,0.2)', 'ticksuffix': '%', 'tickfont': {'color': '#ffffff'}},
-        coloraxis_showscale=False,
         showlegend=False
     )
     
@@ -315,9 +343,29 @@ def create_category_comparison(category_scores, metric_name):
         marker_opacity=0.8,
         width=0.6
     )
-    return fig
+    return _apply_theme(fig)
+
+# Static welcome block: one markdown element instead of columns + ~10 calls
+_WELCOME_HTML = (
+    '<hr>'
+    '<div class="welcome-grid">'
+    '<div class="info-card glass-card">'
+    '<h3>👥 Annotator Agreement</h3>'
+    "<p>Check if your reviewers are giving consistent feedback on the AI's performance.</p>"
+    '</div>'
+    '<div class="info-card glass-card">'
+    '<h3>🎯 Model Accuracy</h3>'
+    '<p>Measure how often the AI gets it right based on human consensus.</p>'
+    '</div>'
+    '</div>'
+    '<hr>'
+)
 
 def main():
+    # Streamlit drops elements that are not re-emitted, so the stylesheet
+    # markup is written on every rerun
+    st.markdown(_stylesheet(), unsafe_allow_html=True)
+    
     # Premium Main Header
     st.markdown("""
     <div style="text-align: center; margin-top: 2.5rem; margin-bottom: 0.5rem;">
@@ -351,13 +399,21 @@ def main():
         
         if uploaded_files:
             st.success(f"✅ {len(uploaded_files)} file(s) ready")
-            st.markdown("---")
-            run_analysis = st.button(" Analyze", type="primary", width="stretch")
         else:
-            run_analysis = False
             st.markdown("---")
             st.info(" Upload 2+ files to start")
         
+        # Options are batched with the Analyze button: changing them does not
+        # rerun the script until Analyze is pressed
+        with st.form("analyze_form", border=False):
+            st.checkbox("Show charts", value=True, key='show_charts',
+                        help="Untick for a faster, metrics-only view of the results "
+                             "(applied when you click Analyze)")
+            run_analysis = st.form_submit_button(" Analyze", type="primary", width="stretch")
+        
+        if not uploaded_files:
+            run_analysis = False
+        
         st.markdown("---")
         st.markdown("### Guide")
         st.markdown("""
@@ -373,48 +429,22 @@ def main():
     # Main content
     if not uploaded_files:
         # Clear any previous results
-        if 'iaa_results' in st.session_state:
-            del st.session_state['iaa_results']
-        if 'eval_results' in st.session_state:
-            del st.session_state['eval_results']
+        st.session_state.pop('iaa_results', None)
+        st.session_state.pop('eval_results', None)
+        st.session_state.pop('last_digest', None)
             
-        # Welcome screen
-        st.markdown("---")
-        
-        c1, c2 = st.columns(2)
-        with c1:
-            st.markdown('<div class="info-card glass-card">', unsafe_allow_html=True)
-            st.markdown("### 👥 Annotator Agreement")
-            st.markdown("""
-            Check if your reviewers are giving consistent feedback on the AI's performance.
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        with c2:
-            st.markdown('<div class="info-card glass-card">', unsafe_allow_html=True)
-            st.markdown("### 🎯 Model Accuracy")
-            st.markdown("""
-            Measure how often the AI gets it right based on human consensus.
-            """)
-            st.markdown('</div>', unsafe_allow_html=True)
-        
-        st.markdown("---")
+        # Welcome screen (static, rendered as a single element)
+        st.markdown(_WELCOME_HTML, unsafe_allow_html=True)
         st.info("**Upload your feedback files from the sidebar to get started**")
         
     elif run_analysis or ('iaa_results' in st.session_state and 'eval_results' in st.session_state):
         # If run_analysis button is clicked, run the analysis
         if run_analysis:
-            # Save uploaded files temporarily
-            temp_dir = Path("temp_uploads")
-            temp_dir.mkdir(exist_ok=True)
-            
-            file_paths = []
-            for uploaded_file in uploaded_files:
-                file_path = temp_dir / uploaded_file.name
-                with open(file_path, 'wb') as f:
-                    f.write(uploaded_file.getbuffer())
-                file_paths.append(str(file_path))
-            
+            # The content hash is the cache key for both phases
+            digest = _upload_digest(uploaded_files)
+        
+        # Re-clicking Analyze with the same files as the last run keeps its results
+        if run_analysis and digest != st.session_state.get('last_digest'):
             # Progress indicator
             progress_bar = st.progress(0)
             status_text = st.empty()
@@ -424,16 +454,14 @@ def main():
                 status_text.text("📊 Phase 3: Calculating Inter-Annotator Agreement...")
                 progress_bar.progress(25)
                 
-                kappa_calc = KappaCalculator()
-                iaa_results = kappa_calc.calculate_agreement(file_paths)
+                iaa_results = _run_iaa(digest, uploaded_files)
                 
                 progress_bar.progress(50)
                 
                 # Phase 4: Model Evaluation
                 status_text.text("📈 Phase 4: Evaluating Model Performance...")
                 
-                model_eval = ModelEvaluator()
-                eval_results = model_eval.evaluate_model(file_paths)
+                eval_results = _run_eval(digest, uploaded_files)
                 
                 progress_bar.progress(100)
                 status_text.text("✅ Analysis Complete!")
@@ -441,10 +469,7 @@ def main():
                 # Store results in session state
                 st.session_state['iaa_results'] = iaa_results
                 st.session_state['eval_results'] = eval_results
-                
-                # Cleanup
-                for file_path in file_paths:
-                    Path(file_path).unlink()
+                st.session_state['last_digest'] = digest
                 
             except Exception as e:
                 st.error(f"❌ Error during analysis: {str(e)}")
@@ -454,56 +479,48 @@ def main():
         # Display results (from session state or just computed)
         display_results(st.session_state['iaa_results'], st.session_state['eval_results'])
 
+@st.cache_resource(show_spinner=False, max_entries=64)
+def _confusion_matrix_figs(confusion_matrices):
+    """Build the heatmap for every category with data, once per result set."""
+    return {
+        cat: create_confusion_matrix_heatmap(cm_data, cat)
+        for cat, cm_data in confusion_matrices.items()
+        if cm_data is not None
+    }
+
+@st.fragment
+def confusion_matrix_fragment(cm_figs):
+    """Category picker + heatmap; changing the category reruns only this fragment."""
+    selected_category = st.selectbox("Category", list(cm_figs.keys()), key="cm_sel")
+    st.plotly_chart(cm_figs[selected_category], width="stretch", config=_PLOTLY_CONFIG)
+
 def display_results(iaa_results, eval_results):
     """Display analysis results in a clean, modern format."""
+    # Gauges and charts can be switched off from the sidebar
+    show_charts = st.session_state.get('show_charts', True)
     
     left_col, right_col = st.columns(2)
     
     with left_col:
-        st.markdown('<div class="glass-card" style="padding: 1.5rem; margin-bottom: 2rem;">', unsafe_allow_html=True)
-        st.markdown('<h2 class="section-header">Annotator Agreement Analysis</h2>', unsafe_allow_html=True)
-        st.caption("How consistently did your annotators evaluate?")
+        st.markdown(section_intro("Annotator Agreement Analysis", "How consistently did your annotators evaluate?"), unsafe_allow_html=True)
         
         # Overview metrics
-        m1, m2, m3, m4 = st.columns(4)
-        
-        with m1:
-            kappa_val = iaa_results['overall_kappa']
-            interpretation, color = interpret_score(kappa_val if kappa_val else 0)
-            st.metric(
-                "Kappa",
-                f"{kappa_val:.2f}" if kappa_val else "N/A",
-                delta=interpretation,
-                help="Cohen's/Fleiss' Kappa"
-            )
-        
-        with m2:
-            agreement = iaa_results.get('overall_raw_agreement', 0)
-            st.metric(
-                "Agreement",
-                f"{agreement*100:.0f}%",
-                help="Simple percentage"
-            )
-        
-        with m3:
-            st.metric(
-                "Reviewers",
-                iaa_results['n_annotators']
-            )
-        
-        with m4:
-            st.metric(
-                "Posts",
-                iaa_results['n_posts']
-            )
+        kappa_val = iaa_results['overall_kappa']
+        interpretation, color = interpret_score(kappa_val if kappa_val else 0)
+        agreement = iaa_results.get('overall_raw_agreement', 0)
+        st.markdown(metric_grid([
+            ("Kappa", f"{kappa_val:.2f}" if kappa_val else "N/A", interpretation, "Cohen's/Fleiss' Kappa"),
+            ("Agreement", f"{agreement*100:.0f}%", None, "Simple percentage"),
+            ("Reviewers", iaa_results['n_annotators'], None, None),
+            ("Posts", iaa_results['n_posts'], None, None)
+        ]), unsafe_allow_html=True)
         
         # Agreement gauge and info
         g_col1, g_col2 = st.columns([1, 1])
         
         with g_col1:
-            kappa_val = iaa_results['overall_kappa']
-            fig = create_score_gauge(kappa_val if kappa_val else 0, "Kappa Score", target=0.60)
-            st.plotly_chart(fig, width="stretch")
+            if show_charts:
+                render_score_gauge(kappa_val if kappa_val else 0, "Kappa Score", target=0.60)
         
         with g_col2:
             kappa = kappa_val if kappa_val else 0
@@ -517,74 +534,54 @@ def display_results(iaa_results, eval_results):
                 st.warning("**Low Agreement**")
         
         # Category-wise Kappa scores
-        if 'category_scores' in iaa_results:
+        if show_charts and 'category_scores' in iaa_results:
             fig = create_category_comparison(iaa_results['category_scores'], 'Kappa Score')
-            st.plotly_chart(fig, width="stretch")
+            st.plotly_chart(fig, width="stretch", config=_PLOTLY_CONFIG)
         
         # Confusion Matrices
-        if 'confusion_matrices' in iaa_results and iaa_results['n_annotators'] == 2:
+        if show_charts and 'confusion_matrices' in iaa_results and iaa_results['n_annotators'] == 2:
             with st.expander("Advanced Matrix"):
-                available_categories = {cat: data for cat, data in iaa_results['confusion_matrices'].items() if data is not None}
-                if available_categories:
-                    selected_category = st.selectbox("Category", list(available_categories.keys()), key="cm_sel")
-                    cm_data = available_categories[selected_category]
-                    fig = create_confusion_matrix_heatmap(cm_data, selected_category)
-                    st.plotly_chart(fig, width="stretch")
-        st.markdown('</div>', unsafe_allow_html=True)
+                cm_figs = _confusion_matrix_figs(iaa_results['confusion_matrices'])
+                if cm_figs:
+                    confusion_matrix_fragment(cm_figs)
 
     with right_col:
-        st.markdown('<div class="glass-card" style="padding: 1.5rem; margin-bottom: 2rem;">', unsafe_allow_html=True)
-        st.markdown('<h2 class="section-header">Model Performance Results</h2>', unsafe_allow_html=True)
-        st.caption("How accurate is your model based on consensus?")
+        st.markdown(section_intro("Model Performance Results", "How accurate is your model based on consensus?"), unsafe_allow_html=True)
         
         # Overview metrics
-        a1, a2, a3, a4 = st.columns(4)
-        
         overall = eval_results['overall_metrics']
         accuracy = overall['overall_accuracy']
-        
-        with a1:
-            interpretation, _ = interpret_score(accuracy)
-            st.metric(
-                "Accuracy",
-                f"{accuracy*100:.1f}%",
-                delta=interpretation
-            )
-        
-        with a2:
-            st.metric("Correct", overall['total_correct'])
-        
-        with a3:
-            st.metric("Errors", overall['total_incorrect'], delta_color="inverse")
-        
-        with a4:
-            st.metric("Unclear", overall['total_uncertain'])
-        
-        # Accuracy gauge
-        fig = create_score_gauge(accuracy, "Model Accuracy", target=0.75)
-        st.plotly_chart(fig, width="stretch")
+        interpretation, _ = interpret_score(accuracy)
+        st.markdown(metric_grid([
+            ("Accuracy", f"{accuracy*100:.1f}%", interpretation, None),
+            ("Correct", overall['total_correct'], None, None),
+            ("Errors", overall['total_incorrect'], None, None),
+            ("Unclear", overall['total_uncertain'], None, None)
+        ]), unsafe_allow_html=True)
         
         # Category-wise accuracy
         accuracy_data = {cat: metrics['accuracy'] for cat, metrics in eval_results['category_results'].items()}
-        fig = create_category_comparison(accuracy_data, 'ModelAccuracy')
-        st.plotly_chart(fig, width="stretch")
+        if show_charts:
+            # Accuracy gauge
+            render_score_gauge(accuracy, "Model Accuracy", target=0.75)
+            fig = create_category_comparison(accuracy_data, 'ModelAccuracy')
+            st.plotly_chart(fig, width="stretch", config=_PLOTLY_CONFIG)
+        
+        # Strengths and weaknesses, partitioned in one pass
+        strong_categories, weak_categories = [], []
+        for cat, acc in accuracy_data.items():
+            (strong_categories if acc >= 0.75 else weak_categories).append((cat, acc))
+        strong_categories.sort(key=itemgetter(1), reverse=True)
+        weak_categories.sort(key=itemgetter(1))
         
-        # Strengths and weaknesses
         sw1, sw2 = st.columns(2)
         with sw1:
-            strong_categories = [(cat, metrics['accuracy']) for cat, metrics in eval_results['category_results'].items() if metrics['accuracy'] >= 0.75]
             if strong_categories:
-                st.markdown("**Top Performers**")
-                for cat, acc in sorted(strong_categories, key=lambda x: x[1], reverse=True):
-                    st.success(f"**{cat.title()}** ({acc*100:.0f}%)")
+                st.markdown(score_list("Top Performers", strong_categories), unsafe_allow_html=True)
         
         with sw2:
-            weak_categories = [(cat, metrics['accuracy']) for cat, metrics in eval_results['category_results'].items() if metrics['accuracy'] < 0.75]
             if weak_categories:
-                st.markdown("**Focus Areas**")
-                for cat, acc in sorted(weak_categories, key=lambda x: x[1]):
-                    st.warning(f"**{cat.title()}** ({acc*100:.0f}%)")
-        st.markdown('</div>', unsafe_allow_html=True)
+                st.markdown(score_list("Focus Areas", weak_categories, weak=True), unsafe_allow_html=True)
 
     # Sample size footer
     st.markdown("---")
@@ -3,18 +3,86 @@ Model Evaluation Runner Script
 Evaluates AI model correctness based on human feedback annotations
 """
 
+import contextlib
+import io
+import json
+import os
+import stat
+import sys
+from itertools import islice
 from model_evaluator import ModelEvaluator
 from pathlib import Path
 
 
-def run_model_evaluation():
+# Console rules shared by every section of the report
+_BAR = "=" * 70
+_DASH = "-" * 70
+_HEADER = "\n" + _BAR
+_FOOTER = _BAR + "\n"
+
+# Script directory (feedback paths are relative to it) and the export folder
+_HERE = Path(__file__).parent
+_OUTPUT_DIR = _HERE.parent / 'results'
+
+# Next-steps guidance by overall accuracy, checked from the highest threshold
+# down; the last entry also covers anything below every threshold
+_NEXT_STEPS = (
+    (0.90, "\n".join([
+        "\n🎉 OUTSTANDING PERFORMANCE!",
+        "\nYour AI model shows excellent accuracy ({acc:.1f}%).",
+        "\n✅ What to do next:",
+        "  1. Document the evaluation methodology",
+        "  2. Analyze the few errors to understand edge cases",
+        "  3. Consider deploying with monitoring",
+        "  4. Scale to 100+ posts for publication-ready results",
+    ])),
+    (0.80, "\n".join([
+        "\n✅ STRONG PERFORMANCE!",
+        "\nYour AI model shows good accuracy ({acc:.1f}%).",
+        "\n📋 Recommended actions:",
+        "  1. Review the error cases in evaluation_details.json",
+        "  2. Identify patterns in incorrect predictions",
+        "  3. Consider category-specific improvements",
+        "  4. Collect more data for robust statistics (aim for 100+ posts)",
+    ])),
+    (0.70, "\n".join([
+        "\n⚠️  FAIR PERFORMANCE",
+        "\nYour AI model shows acceptable accuracy ({acc:.1f}%).",
+        "\n🔧 Improvement needed:",
+        "  1. Focus on weakest categories (check results above)",
+        "  2. Analyze problem posts for common patterns",
+        "  3. Consider retraining or fine-tuning the model",
+        "  4. Review and update classification guidelines",
+    ])),
+    (0.0, "\n".join([
+        "\n❌ NEEDS SIGNIFICANT IMPROVEMENT",
+        "\nYour AI model accuracy is below threshold ({acc:.1f}%).",
+        "\n🔧 Critical actions:",
+        "  1. Review all error cases systematically",
+        "  2. Identify if errors are in specific categories",
+        "  3. Consider model retraining with feedback data",
+        "  4. Validate that annotation guidelines are clear",
+        "  5. Check if the task itself is well-defined",
+    ])),
+)
+
+
+def run_model_evaluation(quiet: bool = False):
     """
     Run AI model evaluation on feedback files.
+    
+    Args:
+        quiet: Skip the banners, progress and guidance output and print a single
+            JSON summary line instead (errors are still reported in full)
     """
+    # Progress output goes through log(); error reports always print
+    log = (lambda *args, **kwargs: None) if quiet else print
+    # The evaluator's own progress and export messages are muted the same way
+    muted = (lambda: contextlib.redirect_stdout(io.StringIO())) if quiet else contextlib.nullcontext
     
-    print("\n" + "="*70)
-    print("  AI MODEL CORRECTNESS EVALUATION")
-    print("="*70 + "\n")
+    log(_HEADER)
+    log("  AI MODEL CORRECTNESS EVALUATION")
+    log(_FOOTER)
     
     # ========================================================================
     # STEP 1: Specify your feedback files
@@ -29,33 +97,37 @@ def run_model_evaluation():
         # '../feedback_data/annotator3.json',
     ]
     
-    print("📂 Checking feedback files...")
-    print("-" * 70)
+    log("📂 Checking feedback files...")
+    log(_DASH)
     
     # Check if files exist
     existing_files = []
     missing_files = []
     
     for filepath in feedback_files:
-        full_path = Path(__file__).parent / filepath
-        if full_path.exists():
-            file_size = full_path.stat().st_size
-            print(f"  ✅ {filepath} ({file_size:,} bytes)")
+        full_path = _HERE / filepath
+        # One stat call both checks for a regular file and gives its size
+        try:
+            file_stat = os.stat(full_path)
+        except OSError:
+            file_stat = None
+        if file_stat is not None and stat.S_ISREG(file_stat.st_mode):
+            log(f"  ✅ {filepath} ({file_stat.st_size:,} bytes)")
             existing_files.append(str(full_path))
         else:
             print(f"  ❌ {filepath} (NOT FOUND)")
             missing_files.append(filepath)
     
-    print("-" * 70)
+    log(_DASH)
     
     if missing_files:
         print(f"\n❌ ERROR: {len(missing_files)} file(s) not found.")
         print("\n💡 SETUP INSTRUCTIONS:")
-        print("-" * 70)
+        print(_DASH)
         print("1. Use the same feedback files from IAA analysis")
         print("2. Files should contain both LLM predictions and human feedback")
         print("3. Update the file paths in this script")
-        print("-" * 70)
+        print(_DASH)
         return
     
     if len(existing_files) < 2:
@@ -66,16 +138,19 @@ def run_model_evaluation():
     # ========================================================================
     # STEP 2: Initialize the evaluator
     # ========================================================================
-    print(f"\n🔧 Initializing Model Evaluator...")
+    log(f"\n🔧 Initializing Model Evaluator...")
     evaluator = ModelEvaluator()
     
     # ========================================================================
     # STEP 3: Evaluate model
     # ========================================================================
-    print(f"📊 Evaluating AI model performance...\n")
+    log(f"📊 Evaluating AI model performance...\n")
     
     try:
-        results = evaluator.evaluate_model(existing_files)
+        # Annotator files are independent, so their disk reads overlap
+        records = evaluator.load_feedback_files(existing_files)
+        with muted():
+            results = evaluator.evaluate_model_from_records(records)
     except Exception as e:
         print(f"\n❌ ERROR during evaluation: {str(e)}")
         print("\n💡 Common issues:")
@@ -89,113 +164,99 @@ def run_model_evaluation():
     # ========================================================================
     # STEP 4: Display results
     # ========================================================================
-    evaluator.print_results(results)
+    if not quiet:
+        evaluator.print_results(results)
     
     # ========================================================================
     # STEP 5: Export results
     # ========================================================================
-    print("\n📤 Exporting results...")
-    print("-" * 70)
+    log("\n📤 Exporting results...")
+    log(_DASH)
     
     # Create output directory
-    output_dir = Path(__file__).parent.parent / 'results'
-    output_dir.mkdir(exist_ok=True)
+    output_dir = _OUTPUT_DIR
+    if not os.path.isdir(output_dir):
+        output_dir.mkdir(exist_ok=True)
     
-    # Export summary results
+    # Export summary results and the detailed per-post report
     summary_file = output_dir / 'model_evaluation.json'
-    evaluator.export_results(results, str(summary_file))
-    
-    # Export detailed per-post report
     detail_file = output_dir / 'evaluation_details.json'
-    evaluator.export_detailed_report(results, str(detail_file))
+    with muted():
+        evaluator.export_all(results, str(summary_file), str(detail_file))
     
-    print("-" * 70)
+    log(_DASH)
     
     # ========================================================================
     # STEP 6: Identify problem areas
     # ========================================================================
-    print("\n" + "="*70)
-    print("  PROBLEM POST ANALYSIS")
-    print("="*70)
-    
     problem_posts = evaluator.identify_problem_posts(results)
     
+    if quiet:
+        # One machine-readable line for scripted callers
+        print(json.dumps({
+            'n_annotators': int(results['n_annotators']),
+            'n_posts': int(results['n_posts']),
+            'overall_accuracy': results['overall_metrics']['overall_accuracy'],
+            'problem_posts': len(problem_posts),
+            'output_dir': str(output_dir)
+        }))
+        return
+    
+    # The closing report is collected line by line and written once per section
+    report = []
+    out = report.append
+    
+    out(_HEADER)
+    out("  PROBLEM POST ANALYSIS")
+    out(_BAR)
+    
+    n_problem_posts = len(problem_posts)
+    
     if problem_posts:
-        print(f"\n⚠️  Found {len(problem_posts)} posts where AI made multiple errors:\n")
-        for post in problem_posts[:10]:  # Show top 10
-            print(f"   • Post {post['postId']}: {post['errors']}/{post['total']} "
-                  f"categories wrong ({post['error_rate']*100:.1f}% error rate)")
+        out(f"\n⚠️  Found {n_problem_posts} posts where AI made multiple errors:\n")
+        for post in islice(problem_posts, 10):  # Show top 10
+            out(f"   • Post {post['postId']}: {post['errors']}/{post['total']} "
+                f"categories wrong ({post['error_rate']*100:.1f}% error rate)")
         
-        if len(problem_posts) > 10:
-            print(f"\n   ... and {len(problem_posts) - 10} more posts with issues")
+        if n_problem_posts > 10:
+            out(f"\n   ... and {n_problem_posts - 10} more posts with issues")
         
-        print("\n💡 Recommendation: Review these posts to identify patterns in AI errors")
+        out("\n💡 Recommendation: Review these posts to identify patterns in AI errors")
     else:
-        print("\n✅ No problematic posts found! AI performs consistently well.")
+        out("\n✅ No problematic posts found! AI performs consistently well.")
     
-    print("="*70)
+    out(_BAR)
+    sys.stdout.write("\n".join(report) + "\n")
+    report.clear()
     
     # ========================================================================
     # STEP 7: Next steps guidance
     # ========================================================================
-    print("\n" + "="*70)
-    print("  NEXT STEPS")
-    print("="*70)
+    out(_HEADER)
+    out("  NEXT STEPS")
+    out(_BAR)
     
     overall_acc = results['overall_metrics']['overall_accuracy']
     
-    if overall_acc >= 0.90:
-        print("\n🎉 OUTSTANDING PERFORMANCE!")
-        print(f"\nYour AI model shows excellent accuracy ({overall_acc*100:.1f}%).")
-        print("\n✅ What to do next:")
-        print("  1. Document the evaluation methodology")
-        print("  2. Analyze the few errors to understand edge cases")
-        print("  3. Consider deploying with monitoring")
-        print("  4. Scale to 100+ posts for publication-ready results")
-        
-    elif overall_acc >= 0.80:
-        print("\n✅ STRONG PERFORMANCE!")
-        print(f"\nYour AI model shows good accuracy ({overall_acc*100:.1f}%).")
-        print("\n📋 Recommended actions:")
-        print("  1. Review the error cases in evaluation_details.json")
-        print("  2. Identify patterns in incorrect predictions")
-        print("  3. Consider category-specific improvements")
-        print("  4. Collect more data for robust statistics (aim for 100+ posts)")
-        
-    elif overall_acc >= 0.70:
-        print("\n⚠️  FAIR PERFORMANCE")
-        print(f"\nYour AI model shows acceptable accuracy ({overall_acc*100:.1f}%).")
-        print("\n🔧 Improvement needed:")
-        print("  1. Focus on weakest categories (check results above)")
-        print("  2. Analyze problem posts for common patterns")
-        print("  3. Consider retraining or fine-tuning the model")
-        print("  4. Review and update classification guidelines")
-        
-    else:
-        print("\n❌ NEEDS SIGNIFICANT IMPROVEMENT")
-        print(f"\nYour AI model accuracy is below threshold ({overall_acc*100:.1f}%).")
-        print("\n🔧 Critical actions:")
-        print("  1. Review all error cases systematically")
-        print("  2. Identify if errors are in specific categories")
-        print("  3. Consider model retraining with feedback data")
-        print("  4. Validate that annotation guidelines are clear")
-        print("  5. Check if the task itself is well-defined")
+    guidance = next((message for threshold, message in _NEXT_STEPS if overall_acc >= threshold),
+                    _NEXT_STEPS[-1][1])
+    out(guidance.format(acc=overall_acc * 100))
     
     # Sample size check
     n_posts = results['n_posts']
     if n_posts < 30:
-        print(f"\n⚠️  SAMPLE SIZE WARNING:")
-        print(f"   Current: {n_posts} posts")
-        print(f"   Minimum recommended: 30 posts for exploratory analysis")
-        print(f"   Publication standard: 100+ posts")
-        print(f"   Action: Collect {100 - n_posts} more posts for robust conclusions")
-    
-    print("\n" + "="*70)
-    print(f"  Evaluation complete!")
-    print(f"  Results saved to: {output_dir}")
-    print("="*70 + "\n")
-
+        out(f"\n⚠️  SAMPLE SIZE WARNING:")
+        out(f"   Current: {n_posts} posts")
+        out(f"   Minimum recommended: 30 posts for exploratory analysis")
+        out(f"   Publication standard: 100+ posts")
+        out(f"   Action: Collect {100 - n_posts} more posts for robust conclusions")
+    
+    out(_HEADER)
+    out(f"  Evaluation complete!")
+    out(f"  Results saved to: {output_dir}")
+    out(_FOOTER)
+    sys.stdout.write("\n".join(report) + "\n")
 
 if __name__ == "__main__":
-    run_model_evaluation()
+    run_model_evaluation(quiet="--quiet" in sys.argv[1:] or os.environ.get("NUTRITION_QUIET") == "1")
 
@@ -0,0 +1,36 @@
+"""
+Shared JSON loader for the pipeline and the dashboard
+"""
+
+import json
+import mmap
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# orjson parses feedback files several times faster; stdlib json is the fallback
+try:
+    import orjson
+    json_loads = orjson.loads
+except ImportError:
+    orjson = None
+    json_loads = json.loads
+
+
+def load_json(source):
+    """Parse a JSON document from a path or a file-like object."""
+    if hasattr(source, 'read'):
+        return json_loads(source.read())
+    with open(source, 'rb') as f:
+        if orjson is not None and os.fstat(f.fileno()).st_size:
+            # Parse straight from the page cache instead of copying the file into bytes
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return orjson.loads(view)
+        return json_loads(f.read())
+
+
+def load_all(load, sources):
+    """Apply load to every source, overlapping their reads; results keep the input order."""
+    if len(sources) < 2:
+        return [load(source) for source in sources]
+    with ThreadPoolExecutor(max_workers=min(8, len(sources))) as pool:
+        return list(pool.map(load, sources))
@@ -3,19 +3,108 @@ Inter-Annotator Agreement Calculator using Kappa Statistics
 Supports both Cohen's Kappa (2 annotators) and Fleiss' Kappa (3+ annotators)
 """
 
+import bisect
 import json
+import sys
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import IO, Dict, List, Optional, Tuple, Union
 import warnings
 
 import numpy as np
 import pandas as pd
-from sklearn.metrics import cohen_kappa_score
-from statsmodels.stats.inter_rater import aggregate_raters, fleiss_kappa
+
+from json_utils import load_all, load_json
 
 warnings.filterwarnings('ignore')
 
 
+# Landis & Koch (1977) bands for _interpret_kappa: _KAPPA_LEVELS[i] covers
+# kappas in [_KAPPA_THRESHOLDS[i-1], _KAPPA_THRESHOLDS[i])
+_KAPPA_THRESHOLDS = (0.0, 0.20, 0.40, 0.60, 0.80)
+_KAPPA_LEVELS = tuple(
+    {'level': level, 'description': description, 'reliability': reliability}
+    for level, description, reliability in (
+        ('Poor', 'Less than chance agreement', 'Unreliable'),
+        ('Slight', 'Slight agreement', 'Low reliability'),
+        ('Fair', 'Fair agreement', 'Moderate reliability'),
+        ('Moderate', 'Moderate agreement', 'Good reliability'),
+        ('Substantial', 'Substantial agreement', 'Very good reliability'),
+        ('Almost Perfect', 'Almost perfect agreement', 'Excellent reliability'),
+    )
+)
+
+_COHENS_INCOMPLETE = "Cohen's Kappa requires both annotators to rate every post"
+
+
+def _complete_rows(ratings: np.ndarray) -> np.ndarray:
+    """Rows of a postId x annotator rating array with no missing (-1) rating."""
+    return ratings[(ratings != -1).all(axis=1)]
+
+
+def _pair_counts(ratings1: np.ndarray, ratings2: np.ndarray) -> np.ndarray:
+    """
+    2x2 contingency table of two binary (0/1) rating arrays, indexed
+    [annotator 1 rating, annotator 2 rating]; pairs with a NaN join no cell.
+    """
+    rated = (ratings1 >= 0) & (ratings2 >= 0)
+    cells = (2 * ratings1[rated] + ratings2[rated]).astype(np.intp)
+    return np.bincount(cells, minlength=4).reshape(2, 2)
+
+
+def _cohens_kappa(confusion: np.ndarray) -> float:
+    """
+    Cohen's Kappa from a 2x2 contingency table (see _pair_counts).
+    
+    Same closed form as sklearn's cohen_kappa_score. Two annotators who never
+    disagree score 1.0.
+    """
+    # Observed vs chance disagreement (the off-diagonal cells)
+    disagreement = confusion[0, 1] + confusion[1, 0]
+    if disagreement == 0:
+        return 1.0
+    expected = np.outer(confusion.sum(axis=1), confusion.sum(axis=0)) / confusion.sum()
+    return 1 - disagreement / (expected[0, 1] + expected[1, 0])
+
+
+def _confusion_summary(confusion: np.ndarray, n_items: int) -> Dict:
+    """Confusion matrix entry for one category (see calculate_confusion_matrices)."""
+    (neg_neg, neg_pos), (pos_neg, pos_pos) = confusion.tolist()
+    return {
+        'matrix': {
+            'positive_positive': pos_pos,
+            'positive_negative': pos_neg,
+            'negative_positive': neg_pos,
+            'negative_negative': neg_neg
+        },
+        'total_items': n_items,
+        'annotator_1_positive_rate': round((pos_pos + pos_neg) / n_items, 4) if n_items > 0 else 0,
+        'annotator_2_positive_rate': round((pos_pos + neg_pos) / n_items, 4) if n_items > 0 else 0
+    }
+
+
+def _fleiss_kappa(count_matrix: np.ndarray) -> float:
+    """
+    Fleiss' Kappa from an (n_items, n_categories) count matrix.
+    
+    Same closed form as statsmodels' fleiss_kappa, without importing statsmodels.
+    A category rated identically by everyone has no chance agreement to
+    correct for and yields NaN, as statsmodels does.
+    """
+    table = 1.0 * np.asarray(count_matrix)
+    n_items = table.shape[0]
+    n_total = table.sum()
+    n_raters = table.sum(1).max()
+    if n_total != n_items * n_raters:
+        raise ValueError("Fleiss' Kappa requires every item to be rated by the same number of annotators")
+    
+    # Observed agreement per item, and chance agreement from the category marginals
+    p_category = table.sum(0) / n_total
+    p_item = ((table * table).sum(1) - n_raters) / (n_raters * (n_raters - 1.))
+    p_mean = p_item.mean()
+    p_mean_expected = (p_category * p_category).sum()
+    return (p_mean - p_mean_expected) / (1 - p_mean_expected)
+
+
 class KappaCalculator:
     """
     Calculate inter-annotator agreement for annotation feedback data.
@@ -33,56 +122,122 @@ class KappaCalculator:
             None: -1  # For missing values
         }
     
-    def load_feedback_json(self, filepath: str) -> Dict:
-        """Load a single feedback JSON file."""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def load_feedback_json(self, filepath: Union[str, IO]) -> Dict:
+        """Load a single feedback JSON file (path or file-like object)."""
+        return load_json(filepath)
+    
+    def load_feedback_files(self, feedback_files: List[Union[str, IO]]) -> List[Dict]:
+        """Load several feedback JSON files, overlapping their reads; results keep the input order."""
+        return load_all(self.load_feedback_json, feedback_files)
     
-    def extract_annotations(self, feedback_files: List[str]) -> pd.DataFrame:
+    def extract_annotations(self, feedback_files: List[Union[str, IO]]) -> pd.DataFrame:
         """
         Extract annotations from multiple feedback JSON files.
         
         Args:
-            feedback_files: List of paths to feedback JSON files (one per annotator)
+            feedback_files: List of paths or file-like objects for feedback JSON files (one per annotator)
             
         Returns:
             DataFrame with columns: postId, annotator, category, rating
         """
-        all_annotations = []
+        records = self.load_feedback_files(feedback_files)
+        return self.extract_annotations_from_records(records)
+    
+    def extract_annotations_from_records(self, records: List[Dict]) -> pd.DataFrame:
+        """
+        Extract annotations from already-parsed feedback JSON documents.
         
-        for annotator_idx, filepath in enumerate(feedback_files):
-            data = self.load_feedback_json(filepath)
+        Args:
+            records: List of parsed feedback JSON documents (one per annotator)
+            
+        Returns:
+            DataFrame with columns: postId, annotator, category, rating
+        """
+        # Collect parallel columns rather than one dict per row; the frame is
+        # built once at the end with the same columns and dtypes
+        post_ids, annotators, ratings, labels = [], [], [], []
+        add_post_ids, add_ratings, add_labels = post_ids.extend, ratings.extend, labels.extend
+        categories_per_post = self.feedback_categories
+        n_categories = len(categories_per_post)
+        label_to_rating = self.label_mapping.get
+        # Posts without feedback all share the same all-missing row values
+        missing_labels = [None] * n_categories
+        missing_ratings = [label_to_rating(None, -1)] * n_categories
+        
+        for annotator_idx, data in enumerate(records):
             annotator_name = f"Annotator_{annotator_idx + 1}"
+            n_rows = len(post_ids)
             
             for post in data.get('posts', []):
-                post_id = post['postId']
+                add_post_ids([post['postId']] * n_categories)
                 feedback = post.get('feedback', {})
+                if not feedback:
+                    add_ratings(missing_ratings)
+                    add_labels(missing_labels)
+                    continue
                 
-                for category in self.feedback_categories:
-                    rating = feedback.get(category)
-                    numeric_rating = self.label_mapping.get(rating, -1)
-                    
-                    all_annotations.append({
-                        'postId': post_id,
-                        'annotator': annotator_name,
-                        'category': category,
-                        'rating': numeric_rating,
-                        'rating_label': rating
-                    })
-        
-        return pd.DataFrame(all_annotations)
-    
-    def prepare_matrix_for_cohens(self, df: pd.DataFrame, category: str) -> Tuple[np.ndarray, np.ndarray]:
+                get_label = feedback.get
+                post_labels = [get_label(category) for category in categories_per_post]
+                add_ratings([label_to_rating(rating, -1) for rating in post_labels])
+                add_labels(post_labels)
+            
+            annotators.extend([annotator_name] * (len(post_ids) - n_rows))
+        
+        if not post_ids:
+            return pd.DataFrame()
+        
+        # Hand pandas ready-typed arrays so it skips per-column dtype inference
+        # (postId keeps inference, since ids may be numbers or strings)
+        return pd.DataFrame({
+            'postId': post_ids,
+            'annotator': np.array(annotators, dtype=object),
+            'category': np.array(categories_per_post * (len(post_ids) // n_categories), dtype=object),
+            'rating': np.array(ratings, dtype=np.int8),
+            'rating_label': np.array(labels, dtype=object)
+        }, copy=False)
+    
+    def build_category_pivots(self, df: pd.DataFrame, values: str = 'rating') -> Optional[Dict[str, pd.DataFrame]]:
+        """
+        Pivot all categories at once into postId x annotator tables.
+        
+        Args:
+            df: DataFrame from extract_annotations
+            values: Column to spread across annotators ('rating' or 'rating_label')
+            
+        Returns:
+            Dictionary of per-category pivots, or None if the annotations cannot be
+            pivoted in one go (e.g. duplicate postIds), in which case each metric
+            pivots its categories individually and reports errors per category
+        """
+        # Ratings are int8 (-1/0/1) and a pivot without holes keeps that dtype;
+        # pandas upcasts one with absent annotators to float, and their NaN
+        # cells deliberately stay distinct from the -1 'no rating' sentinel
+        try:
+            wide = df.pivot(index='postId', columns=['category', 'annotator'], values=values)
+        except (KeyError, ValueError):
+            return None
+        
+        present = set(wide.columns.get_level_values('category'))
+        return {category: wide[category] for category in self.feedback_categories if category in present}
+    
+    def _category_pivot(self, df: pd.DataFrame, category: str, pivots: Optional[Dict[str, pd.DataFrame]] = None,
+                        values: str = 'rating') -> pd.DataFrame:
+        """Pivot for one category, taken from precomputed pivots when available."""
+        if pivots is not None and category in pivots:
+            return pivots[category]
+        category_data = df[df['category'] == category]
+        return category_data.pivot(index='postId', columns='annotator', values=values)
+    
+    def prepare_matrix_for_cohens(self, df: pd.DataFrame, category: str,
+                                  pivots: Optional[Dict[str, pd.DataFrame]] = None) -> Tuple[np.ndarray, np.ndarray]:
         """
         Prepare data for Cohen's Kappa (2 annotators).
         
         Returns:
             Two arrays of ratings from annotator 1 and annotator 2
         """
-        category_data = df[df['category'] == category].copy()
-        
         # Pivot to get annotators as columns
-        pivot = category_data.pivot(index='postId', columns='annotator', values='rating')
+        pivot = self._category_pivot(df, category, pivots)
         
         # Get the two annotators
         annotators = pivot.columns.tolist()
@@ -90,79 +245,48 @@ class KappaCalculator:
             raise ValueError(f"Cohen's Kappa requires exactly 2 annotators, found {len(annotators)}")
         
         # Remove rows with missing values (-1)
-        mask = (pivot[annotators[0]] != -1) & (pivot[annotators[1]] != -1)
-        clean_data = pivot[mask]
+        ratings = _complete_rows(pivot.to_numpy())
         
-        return clean_data[annotators[0]].values, clean_data[annotators[1]].values
+        return ratings[:, 0], ratings[:, 1]
     
-    def prepare_matrix_for_fleiss(self, df: pd.DataFrame, category: str) -> np.ndarray:
+    def prepare_matrix_for_fleiss(self, df: pd.DataFrame, category: str,
+                                  pivots: Optional[Dict[str, pd.DataFrame]] = None) -> np.ndarray:
         """
         Prepare data for Fleiss' Kappa (3+ annotators).
         
         Returns:
             Matrix of shape (n_items, n_categories) where each cell contains count
         """
-        category_data = df[df['category'] == category].copy()
-        
         # Pivot to get annotators as columns
-        pivot = category_data.pivot(index='postId', columns='annotator', values='rating')
+        pivot = self._category_pivot(df, category, pivots)
         
         # Remove rows with any missing values (-1)
-        clean_data = pivot[(pivot != -1).all(axis=1)]
+        ratings = _complete_rows(pivot.to_numpy())
         
-        if len(clean_data) == 0:
+        if len(ratings) == 0:
             raise ValueError(f"No complete annotations found for category: {category}")
         
         # Count ratings per item (row)
-        # For binary classification (0 or 1), we need counts
-        n_items = len(clean_data)
-        n_categories = 2  # positive (1) and negative (0)
-        
-        # Create count matrix
-        count_matrix = np.zeros((n_items, n_categories))
-        
-        for idx, (_, row) in enumerate(clean_data.iterrows()):
-            for rating in row:
-                if rating in [0, 1]:
-                    count_matrix[idx, int(rating)] += 1
+        # For binary classification (0 or 1), we need counts; column 0 counts
+        # negative and column 1 positive ratings (absent annotators are NaN)
+        count_matrix = np.stack([(ratings == 0).sum(axis=1), (ratings == 1).sum(axis=1)], axis=1).astype(float)
         
         return count_matrix
     
-    def calculate_cohens_kappa(self, df: pd.DataFrame) -> Dict[str, float]:
-        """Calculate Cohen's Kappa for each category."""
-        results = {}
-        
-        for category in self.feedback_categories:
-            try:
-                ratings1, ratings2 = self.prepare_matrix_for_cohens(df, category)
-                
-                # Check for perfect agreement (100% same ratings)
-                if np.array_equal(ratings1, ratings2):
-                    # Perfect agreement - assign Kappa = 1.0
-                    results[category] = 1.0
-                else:
-                    kappa = cohen_kappa_score(ratings1, ratings2)
-                    results[category] = round(kappa, 4)
-                
-            except Exception as e:
-                print(f"Error calculating Cohen's Kappa for {category}: {str(e)}")
-                results[category] = None
-        
-        return results
-    
-    def calculate_fleiss_kappa(self, df: pd.DataFrame) -> Dict[str, float]:
+    def calculate_fleiss_kappa(self, df: pd.DataFrame,
+                               pivots: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, float]:
         """Calculate Fleiss' Kappa for each category."""
         results = {}
         
         for category in self.feedback_categories:
             try:
-                count_matrix = self.prepare_matrix_for_fleiss(df, category)
+                count_matrix = self.prepare_matrix_for_fleiss(df, category, pivots)
                 
                 if len(count_matrix) == 0:
                     results[category] = None
                     continue
                 
-                kappa = fleiss_kappa(count_matrix)
+                kappa = _fleiss_kappa(count_matrix)
                 results[category] = round(kappa, 4)
                 
             except Exception as e:
@@ -171,7 +295,8 @@ class KappaCalculator:
         
         return results
     
-    def calculate_raw_agreement(self, df: pd.DataFrame) -> Dict[str, float]:
+    def calculate_raw_agreement(self, df: pd.DataFrame,
+                                pivots: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, float]:
         """
         Calculate raw percentage agreement for each category.
         
@@ -182,26 +307,20 @@ class KappaCalculator:
         
         for category in self.feedback_categories:
             try:
-                category_data = df[df['category'] == category].copy()
-                
                 # Pivot to get annotators as columns
-                pivot = category_data.pivot(index='postId', columns='annotator', values='rating')
+                pivot = self._category_pivot(df, category, pivots)
                 
                 # Remove rows with missing values (-1)
-                clean_data = pivot[(pivot != -1).all(axis=1)]
+                ratings = _complete_rows(pivot.to_numpy())
                 
-                if len(clean_data) == 0:
+                if len(ratings) == 0:
                     results[category] = None
                     continue
                 
                 # Calculate agreement: how many rows have all same values
-                agreements = 0
-                total = len(clean_data)
-                
-                for _, row in clean_data.iterrows():
-                    # Check if all values in the row are the same
-                    if len(set(row.values)) == 1:
-                        agreements += 1
+                # (a NaN for an absent annotator never matches)
+                agreements = int((ratings == ratings[:, :1]).all(axis=1).sum())
+                total = len(ratings)
                 
                 raw_agreement = agreements / total if total > 0 else 0
                 results[category] = round(raw_agreement, 4)
@@ -213,7 +332,8 @@ class KappaCalculator:
         return results
     
     
-    def calculate_confusion_matrices(self, df: pd.DataFrame) -> Dict[str, Dict]:
+    def calculate_confusion_matrices(self, df: pd.DataFrame,
+                                     pivots: Optional[Dict[str, pd.DataFrame]] = None) -> Dict[str, Dict]:
         """
         Calculate confusion matrix for each category (for 2 annotators).
         
@@ -229,40 +349,24 @@ class KappaCalculator:
         
         for category in self.feedback_categories:
             try:
-                category_data = df[df['category'] == category].copy()
-                
                 # Pivot to get annotators as columns
-                pivot = category_data.pivot(index='postId', columns='annotator', values='rating')
+                pivot = self._category_pivot(df, category, pivots)
                 
                 # Get annotator names
                 annotators = pivot.columns.tolist()
                 ann1, ann2 = annotators[0], annotators[1]
                 
                 # Remove rows with missing values (-1)
-                clean_data = pivot[(pivot[ann1] != -1) & (pivot[ann2] != -1)]
+                ratings = _complete_rows(pivot[[ann1, ann2]].to_numpy())
                 
-                if len(clean_data) == 0:
+                if len(ratings) == 0:
                     results[category] = None
                     continue
                 
                 # Build confusion matrix
                 # Count: (Ann1=Pos, Ann2=Pos), (Ann1=Pos, Ann2=Neg), etc.
-                pos_pos = len(clean_data[(clean_data[ann1] == 1) & (clean_data[ann2] == 1)])
-                pos_neg = len(clean_data[(clean_data[ann1] == 1) & (clean_data[ann2] == 0)])
-                neg_pos = len(clean_data[(clean_data[ann1] == 0) & (clean_data[ann2] == 1)])
-                neg_neg = len(clean_data[(clean_data[ann1] == 0) & (clean_data[ann2] == 0)])
-                
-                results[category] = {
-                    'matrix': {
-                        'positive_positive': pos_pos,
-                        'positive_negative': pos_neg,
-                        'negative_positive': neg_pos,
-                        'negative_negative': neg_neg
-                    },
-                    'total_items': len(clean_data),
-                    'annotator_1_positive_rate': round((pos_pos + pos_neg) / len(clean_data), 4) if len(clean_data) > 0 else 0,
-                    'annotator_2_positive_rate': round((pos_pos + neg_pos) / len(clean_data), 4) if len(clean_data) > 0 else 0
-                }
+                confusion = _pair_counts(ratings[:, 0], ratings[:, 1])
+                results[category] = _confusion_summary(confusion, len(ratings))
                 
             except Exception as e:
                 print(f"Error calculating confusion matrix for {category}: {str(e)}")
@@ -271,37 +375,100 @@ class KappaCalculator:
         return results
     
     
+    def calculate_pairwise_metrics(self, df: pd.DataFrame,
+                                   pivots: Optional[Dict[str, pd.DataFrame]] = None
+                                   ) -> Tuple[Dict[str, float], Dict[str, float], Dict[str, Dict]]:
+        """
+        Calculate Cohen's Kappa, raw agreement and the confusion matrix for each
+        category (2 annotators) in one pass, from a single 2x2 count per category.
+        
+        Returns:
+            Tuple of (Cohen's Kappa scores, raw agreement scores, confusion
+            matrices), the latter two as calculate_raw_agreement and
+            calculate_confusion_matrices compute them
+        """
+        kappa_scores, raw_agreement_scores, confusion_matrices = {}, {}, {}
+        
+        for category in self.feedback_categories:
+            try:
+                ratings1, ratings2 = self.prepare_matrix_for_cohens(df, category, pivots)
+            except Exception as e:
+                for metric, scores in (("Cohen's Kappa", kappa_scores),
+                                       ('raw agreement', raw_agreement_scores),
+                                       ('confusion matrix', confusion_matrices)):
+                    print(f"Error calculating {metric} for {category}: {str(e)}")
+                    scores[category] = None
+                continue
+            
+            confusion = _pair_counts(ratings1, ratings2)
+            n_items = len(ratings1)
+            
+            if np.isnan(ratings1).any() or np.isnan(ratings2).any():
+                print(f"Error calculating Cohen's Kappa for {category}: {_COHENS_INCOMPLETE}")
+                kappa_scores[category] = None
+            else:
+                kappa_scores[category] = round(_cohens_kappa(confusion), 4)
+            
+            if n_items == 0:
+                raw_agreement_scores[category] = None
+                confusion_matrices[category] = None
+                continue
+            
+            # Agreeing posts are the diagonal (a NaN for an absent annotator never matches)
+            raw_agreement_scores[category] = round(int(np.trace(confusion)) / n_items, 4)
+            confusion_matrices[category] = _confusion_summary(confusion, n_items)
+        
+        return kappa_scores, raw_agreement_scores, confusion_matrices
+    
     def print_confusion_matrix(self, category: str, cm_data: Dict):
         """Pretty print a confusion matrix."""
+        sys.stdout.write("\n".join(self._confusion_matrix_lines(category, cm_data)) + "\n")
+    
+    def _confusion_matrix_lines(self, category: str, cm_data: Dict) -> List[str]:
+        """Lines of the pretty-printed confusion matrix for one category."""
         if cm_data is None:
-            print(f"\n{category}: No data available")
-            return
+            return [f"\n{category}: No data available"]
         
         matrix = cm_data['matrix']
         total = cm_data['total_items']
         
-        print(f"\n{category.upper()} - Confusion Matrix (n={total})")
-        print("─" * 50)
-        print(f"                    Annotator 2")
-        print(f"                    Positive    Negative")
-        print(f"Annotator 1  Pos      {matrix['positive_positive']:3d}         {matrix['positive_negative']:3d}")
-        print(f"             Neg      {matrix['negative_positive']:3d}         {matrix['negative_negative']:3d}")
-        print("─" * 50)
-        print(f"Ann1 Positive Rate: {cm_data['annotator_1_positive_rate']:.2%}")
-        print(f"Ann2 Positive Rate: {cm_data['annotator_2_positive_rate']:.2%}") 
-        
-    def calculate_agreement(self, feedback_files: List[str]) -> Dict:
+        return [
+            f"\n{category.upper()} - Confusion Matrix (n={total})",
+            "─" * 50,
+            f"                    Annotator 2",
+            f"                    Positive    Negative",
+            f"Annotator 1  Pos      {matrix['positive_positive']:3d}         {matrix['positive_negative']:3d}",
+            f"             Neg      {matrix['negative_positive']:3d}         {matrix['negative_negative']:3d}",
+            "─" * 50,
+            f"Ann1 Positive Rate: {cm_data['annotator_1_positive_rate']:.2%}",
+            f"Ann2 Positive Rate: {cm_data['annotator_2_positive_rate']:.2%}"
+        ]
+        
+    def calculate_agreement(self, feedback_files: List[Union[str, IO]]) -> Dict:
         """
         Main method to calculate inter-annotator agreement.
         
         Args:
-            feedback_files: List of paths to feedback JSON files
+            feedback_files: List of paths or file-like objects for feedback JSON files
+            
+        Returns:
+            Dictionary with kappa scores and interpretation
+        """
+        records = self.load_feedback_files(feedback_files)
+        return self.calculate_agreement_from_records(records)
+    
+    def calculate_agreement_from_records(self, records: List[Dict]) -> Dict:
+        """
+        Calculate inter-annotator agreement from already-parsed feedback JSON.
+        
+        Args:
+            records: List of parsed feedback JSON documents (one per annotator)
             
         Returns:
             Dictionary with kappa scores and interpretation
         """
         # Extract all annotations
-        df = self.extract_annotations(feedback_files)
+        df = self.extract_annotations_from_records(records)
         
         # Get number of annotators
         n_annotators = df['annotator'].nunique()
@@ -313,14 +480,18 @@ class KappaCalculator:
         print(f"Categories analyzed: {', '.join(self.feedback_categories)}")
         print(f"{'='*60}\n")
         
+        # One pivot of every category, shared by all the metrics below
+        pivots = self.build_category_pivots(df)
+        
         # Choose appropriate Kappa
         if n_annotators == 2:
             print("Using Cohen's Kappa (2 annotators)\n")
-            kappa_scores = self.calculate_cohens_kappa(df)
+            # Kappa, raw agreement and confusion matrices share one count per category
+            kappa_scores, raw_agreement_scores, confusion_matrices = self.calculate_pairwise_metrics(df, pivots)
             kappa_type = "Cohen's Kappa"
         elif n_annotators >= 3:
             print("Using Fleiss' Kappa (3+ annotators)\n")
-            kappa_scores = self.calculate_fleiss_kappa(df)
+            kappa_scores = self.calculate_fleiss_kappa(df, pivots)
             kappa_type = "Fleiss' Kappa"
         else:
             raise ValueError("Need at least 2 annotators")
@@ -329,12 +500,12 @@ class KappaCalculator:
         valid_scores = [v for v in kappa_scores.values() if v is not None]
         overall_kappa = round(np.mean(valid_scores), 4) if valid_scores else None
         print("📊 Calculating additional metrics...\n")
-        # Calculate raw agreement
-        raw_agreement_scores = self.calculate_raw_agreement(df)
+        if n_annotators >= 3:
+            # Calculate raw agreement and confusion matrices
+            raw_agreement_scores = self.calculate_raw_agreement(df, pivots)
+            confusion_matrices = self.calculate_confusion_matrices(df, pivots)
         overall_raw_agreement = round(np.mean([v for v in raw_agreement_scores.values() if v is not None]), 4) if any(v is not None for v in raw_agreement_scores.values()) else None
         
-        # Calculate confusion matrices
-        confusion_matrices = self.calculate_confusion_matrices(df)
         # Interpret scores
         interpretation = self._interpret_kappa(overall_kappa)
         
@@ -364,123 +535,99 @@ class KappaCalculator:
                 'reliability': 'N/A'
             }
         
-        if kappa < 0:
-            level = 'Poor'
-            description = 'Less than chance agreement'
-            reliability = 'Unreliable'
-        elif kappa < 0.20:
-            level = 'Slight'
-            description = 'Slight agreement'
-            reliability = 'Low reliability'
-        elif kappa < 0.40:
-            level = 'Fair'
-            description = 'Fair agreement'
-            reliability = 'Moderate reliability'
-        elif kappa < 0.60:
-            level = 'Moderate'
-            description = 'Moderate agreement'
-            reliability = 'Good reliability'
-        elif kappa < 0.80:
-            level = 'Substantial'
-            description = 'Substantial agreement'
-            reliability = 'Very good reliability'
-        else:
-            level = 'Almost Perfect'
-            description = 'Almost perfect agreement'
-            reliability = 'Excellent reliability'
-        
-        return {
-            'level': level,
-            'description': description,
-            'reliability': reliability
-        }
+        return dict(_KAPPA_LEVELS[bisect.bisect_right(_KAPPA_THRESHOLDS, kappa)])
     
     def print_results(self, results: Dict):
         """Print formatted results."""
-        print(f"\n{'='*60}")
-        print(f"RESULTS - {results['kappa_type']}")
-        print(f"{'='*60}\n")
-        
-        print("Category-wise Kappa Scores:")
-        print("-" * 60)
+        # Build the whole report, then write it in one go
+        lines = [
+            f"\n{'='*60}",
+            f"RESULTS - {results['kappa_type']}",
+            f"{'='*60}\n",
+            "Category-wise Kappa Scores:",
+            "-" * 60
+        ]
         for category, score in results['category_scores'].items():
             if score is not None:
                 interpretation = self._interpret_kappa(score)
-                print(f"{category:20s}: {score:6.4f}  ({interpretation['level']})")
+                lines.append(f"{category:20s}: {score:6.4f}  ({interpretation['level']})")
             else:
-                print(f"{category:20s}: N/A")
-        print("\n" + "=" * 60)
-        print("RAW AGREEMENT PERCENTAGES")
-        print("=" * 60)
+                lines.append(f"{category:20s}: N/A")
+        lines += ["\n" + "=" * 60, "RAW AGREEMENT PERCENTAGES", "=" * 60]
         for category, score in results['raw_agreement_scores'].items():
             if score is not None:
-                print(f"{category:20s}: {score:6.2%}")
+                lines.append(f"{category:20s}: {score:6.2%}")
             else:
-                print(f"{category:20s}: N/A")
-
+                lines.append(f"{category:20s}: N/A")
+        
+        lines += [
+            "\n" + "=" * 60,
+            f"Overall Kappa Score: {results['overall_kappa']}",
+            f"Agreement Level: {results['interpretation']['level']}",
+            f"Description: {results['interpretation']['description']}",
+            f"Reliability: {results['interpretation']['reliability']}",
+            "=" * 60,
+            "\n" + "=" * 60,
+            "CONFUSION MATRICES",
+            "=" * 60
+        ]
         
-        print("\n" + "=" * 60)
-        print(f"Overall Kappa Score: {results['overall_kappa']}")
-        print(f"Agreement Level: {results['interpretation']['level']}")
-        print(f"Description: {results['interpretation']['description']}")
-        print(f"Reliability: {results['interpretation']['reliability']}")
-        print("=" * 60)
-
-        print("\n" + "=" * 60)
-        print("CONFUSION MATRICES")
-        print("=" * 60)
-
         if results['n_annotators'] == 2:
             for category in self.feedback_categories:
                 cm_data = results['confusion_matrices'].get(category)
-                self.print_confusion_matrix(category, cm_data)
+                lines += self._confusion_matrix_lines(category, cm_data)
         else:
-            print("(Confusion matrices only available for 2 annotators)")
-
+            lines.append("(Confusion matrices only available for 2 annotators)")
         
         # Provide guidance
-        self._print_guidance(results['overall_kappa'])
+        lines += self._guidance_lines(results['overall_kappa'])
+        sys.stdout.write("\n".join(lines) + "\n")
     
-    def _print_guidance(self, kappa: float):
-        """Print guidance based on Kappa score."""
-        print(f"\n{'='*60}")
-        print("GUIDANCE FOR YOUR ASSESSMENT")
-        print("=" * 60)
+    def _guidance_lines(self, kappa: float) -> List[str]:
+        """Lines of the guidance printed for a Kappa score."""
+        lines = [f"\n{'='*60}", "GUIDANCE FOR YOUR ASSESSMENT", "=" * 60]
         
         if kappa is None:
-            print("❌ Unable to calculate agreement - check your data")
+            lines.append("❌ Unable to calculate agreement - check your data")
         elif kappa >= 0.60:
-            print("✅ HIGH AGREEMENT (Kappa ≥ 0.6)")
-            print("\nWhat this means for your professor:")
-            print("  • Human evaluators consistently agreed on the model's performance")
-            print("  • The 'Thumbs Down' signals are reliable error indicators")
-            print("  • Your evaluation methodology is sound and reproducible")
-            print("\nNext steps:")
-            print("  • Proceed with confidence to Phase 4 (Model Evaluation)")
-            print("  • Use majority voting for consensus scores")
+            lines += [
+                "✅ HIGH AGREEMENT (Kappa ≥ 0.6)",
+                "\nWhat this means for your professor:",
+                "  • Human evaluators consistently agreed on the model's performance",
+                "  • The 'Thumbs Down' signals are reliable error indicators",
+                "  • Your evaluation methodology is sound and reproducible",
+                "\nNext steps:",
+                "  • Proceed with confidence to Phase 4 (Model Evaluation)",
+                "  • Use majority voting for consensus scores"
+            ]
         elif kappa >= 0.40:
-            print("⚠️ MODERATE AGREEMENT (0.4 ≤ Kappa < 0.6)")
-            print("\nWhat this means:")
-            print("  • There is reasonable agreement, but some ambiguity")
-            print("  • Some posts may be genuinely difficult to judge")
-            print("  • Consider reviewing disagreement cases")
-            print("\nRecommendations:")
-            print("  • Identify posts with high disagreement")
-            print("  • Refine annotation guidelines")
-            print("  • Consider a discussion round among annotators")
+            lines += [
+                "⚠️ MODERATE AGREEMENT (0.4 ≤ Kappa < 0.6)",
+                "\nWhat this means:",
+                "  • There is reasonable agreement, but some ambiguity",
+                "  • Some posts may be genuinely difficult to judge",
+                "  • Consider reviewing disagreement cases",
+                "\nRecommendations:",
+                "  • Identify posts with high disagreement",
+                "  • Refine annotation guidelines",
+                "  • Consider a discussion round among annotators"
+            ]
         else:
-            print("❌ LOW AGREEMENT (Kappa < 0.4)")
-            print("\nWhat this means:")
-            print("  • Posts are too ambiguous for consistent judgment")
-            print("  • Annotation guidelines may need clarification")
-            print("  • Human annotators couldn't reliably agree")
-            print("\nAction required:")
-            print("  • Review and clarify annotation instructions")
-            print("  • Provide examples of edge cases")
-            print("  • Consider training session for annotators")
-            print("  • Re-annotate with clearer guidelines")
-        
-        print("=" * 60 + "\n")
+            lines += [
+                "❌ LOW AGREEMENT (Kappa < 0.4)",
+                "\nWhat this means:",
+                "  • Posts are too ambiguous for consistent judgment",
+                "  • Annotation guidelines may need clarification",
+                "  • Human annotators couldn't reliably agree",
+                "\nAction required:",
+                "  • Review and clarify annotation instructions",
+                "  • Provide examples of edge cases",
+                "  • Consider training session for annotators",
+                "  • Re-annotate with clearer guidelines"
+            ]
+        
+        lines.append("=" * 60 + "\n")
+        return lines
     
     def export_results(self, results: Dict, output_path: str):
         """Export results to JSON file."""
@@ -506,22 +653,26 @@ class KappaCalculator:
         """Generate a detailed report of disagreements between annotators."""
         df = results['raw_data']
         
-        # Pivot to get annotators as columns for each category
+        # Pivot the labels of every category at once to get annotators as columns
+        # (labels rather than ratings, so unmapped labels still count as distinct)
+        label_pivots = self.build_category_pivots(df, values='rating_label')
         disagreements = []
         
         for category in self.feedback_categories:
-            category_data = df[df['category'] == category].copy()
-            pivot = category_data.pivot(index='postId', columns='annotator', values='rating_label')
+            pivot = self._category_pivot(df, category, label_pivots, values='rating_label')
+            if pivot.empty:
+                continue
             
-            # Find rows where annotators disagree
-            for post_id, row in pivot.iterrows():
-                ratings = row.dropna().tolist()
-                if len(set(ratings)) > 1:  # Disagreement
-                    disagreements.append({
-                        'postId': post_id,
-                        'category': category,
-                        'annotations': row.to_dict()
-                    })
+            # Find rows where annotators disagree (missing labels are ignored):
+            # compare every present label with the first present one in its row
+            labels = pivot.to_numpy()
+            present = pivot.notna().to_numpy()
+            first = labels[np.arange(len(labels)), present.argmax(axis=1)]
+            disagreeing = pivot[((labels != first[:, None]) & present).any(axis=1)]
+            disagreements.extend(
+                {'postId': post_id, 'category': category, 'annotations': annotations}
+                for post_id, annotations in disagreeing.to_dict('index').items()
+            )
         
         # Export disagreements
         with open(output_path, 'w', encoding='utf-8') as f:
@@ -4,12 +4,25 @@ Evaluates AI predictions against human consensus feedback (thumbs up/down)
 """
 
 import json
+import sys
 import numpy as np
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import IO, List, Dict, Optional, Tuple, Union
 from collections import Counter
 
+from json_utils import load_all, load_json, orjson
+
+
+def _write_json(data, output_path: str):
+    """Write data as indented UTF-8 JSON, encoded by orjson when it is available."""
+    if orjson is not None:
+        with open(output_path, 'wb') as f:
+            f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY))
+    else:
+        with open(output_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, indent=2, ensure_ascii=False)
+
 
 class ModelEvaluator:
     """
@@ -33,26 +46,56 @@ class ModelEvaluator:
             'negative': 0,   # AI was wrong
             None: -1         # No feedback provided
         }
+        
+        # Create proper camelCase field names for the AI predictions
+        self.field_name_map = {
+            'overall': 'llmOverall',  # Note: this field doesn't exist in your JSON
+            'theme': 'llmTheme',
+            'objects': 'llmObjects',
+            'sentiment': 'llmSentiment',
+            'contentQuality': 'llmContentQuality',  # Fixed!
+            'contentIntent': 'llmContentIntent'      # Fixed!
+        }
     
-    def load_feedback_json(self, filepath: str) -> Dict:
-        """Load a feedback JSON file."""
-        with open(filepath, 'r', encoding='utf-8') as f:
-            return json.load(f)
+    def load_feedback_json(self, filepath: Union[str, IO]) -> Dict:
+        """Load a feedback JSON file (path or file-like object)."""
+        return load_json(filepath)
     
-    def extract_evaluations(self, feedback_files: List[str]) -> pd.DataFrame:
+    def load_feedback_files(self, feedback_files: List[Union[str, IO]]) -> List[Dict]:
+        """Load several feedback JSON files, overlapping their reads; results keep the input order."""
+        return load_all(self.load_feedback_json, feedback_files)
+    
+    def extract_evaluations(self, feedback_files: List[Union[str, IO]]) -> pd.DataFrame:
         """
         Extract AI predictions and human evaluations from feedback files.
         
         Args:
-            feedback_files: List of paths to feedback JSON files (one per annotator)
+            feedback_files: List of paths or file-like objects for feedback JSON files (one per annotator)
             
         Returns:
             DataFrame with AI predictions and human correctness judgments
         """
-        all_evaluations = []
+        records = self.load_feedback_files(feedback_files)
+        return self.extract_evaluations_from_records(records)
+    
+    def extract_evaluations_from_records(self, records: List[Dict]) -> pd.DataFrame:
+        """
+        Extract AI predictions and human evaluations from already-parsed feedback JSON.
         
-        for annotator_idx, filepath in enumerate(feedback_files):
-            data = self.load_feedback_json(filepath)
+        Args:
+            records: List of parsed feedback JSON documents (one per annotator)
+            
+        Returns:
+            DataFrame with AI predictions and human correctness judgments
+        """
+        # Collect parallel columns rather than one dict per row; the frame is
+        # built once at the end with the same columns and dtypes
+        post_ids, annotators, categories, predictions, judgments, is_correct = [], [], [], [], [], []
+        # Each category with the field holding its AI prediction
+        category_fields = [(category, self.field_name_map.get(category)) for category in self.feedback_categories]
+        judgment_to_numeric = self.feedback_mapping.get
+        
+        for annotator_idx, data in enumerate(records):
             annotator_name = f"Annotator_{annotator_idx + 1}"
             
             for post in data.get('posts', []):
@@ -60,38 +103,39 @@ class ModelEvaluator:
                 llm_predictions = post.get('llm', {})
                 feedback = post.get('feedback', {})
                 
-                for category in self.feedback_categories:
+                for category, ai_field in category_fields:
                     # Get AI prediction
-                    # Create proper camelCase field names
-                    field_name_map = {
-                        'overall': 'llmOverall',  # Note: this field doesn't exist in your JSON
-                        'theme': 'llmTheme',
-                        'objects': 'llmObjects',
-                        'sentiment': 'llmSentiment',
-                        'contentQuality': 'llmContentQuality',  # Fixed!
-                        'contentIntent': 'llmContentIntent'      # Fixed!
-                    }
-                    ai_prediction = llm_predictions.get(field_name_map.get(category))
+                    ai_prediction = llm_predictions.get(ai_field)
                     if ai_prediction is None:
-                        print(f"⚠️  Warning: Missing {field_name_map.get(category)} for post {post_id}")
+                        print(f"⚠️  Warning: Missing {ai_field} for post {post_id}")
                     if category == 'objects' and isinstance(ai_prediction, list):
                         ai_prediction = ai_prediction[0] if ai_prediction else None
 
                     # Get human judgment (was AI correct?)
                     correctness_judgment = feedback.get(category)
-                    correctness_numeric = self.feedback_mapping.get(correctness_judgment, -1)
                     
-                    all_evaluations.append({
-                        'postId': post_id,
-                        'annotator': annotator_name,
-                        'category': category,
-                        'ai_prediction': ai_prediction,
-                        'human_judgment': correctness_judgment,
-                        'is_correct': correctness_numeric,
-                        'judgment_label': correctness_judgment
-                    })
-        
-        return pd.DataFrame(all_evaluations)
+                    post_ids.append(post_id)
+                    annotators.append(annotator_name)
+                    categories.append(category)
+                    predictions.append(ai_prediction)
+                    judgments.append(correctness_judgment)
+                    is_correct.append(judgment_to_numeric(correctness_judgment, -1))
+        
+        if not post_ids:
+            return pd.DataFrame()
+        
+        # Hand pandas ready-typed arrays where the type is known, so it skips
+        # dtype inference for them (ids and predictions keep inference)
+        judgments = np.array(judgments, dtype=object)
+        return pd.DataFrame({
+            'postId': post_ids,
+            'annotator': np.array(annotators, dtype=object),
+            'category': np.array(categories, dtype=object),
+            'ai_prediction': predictions,
+            'human_judgment': judgments,
+            'is_correct': np.array(is_correct, dtype=np.int8),
+            'judgment_label': judgments.copy()
+        }, copy=False)
     
     def build_consensus(self, df: pd.DataFrame, category: str, post_id: str) -> Tuple[str, float, List]:
         """
@@ -130,45 +174,88 @@ class ModelEvaluator:
         
         return consensus, confidence, judgments
     
-    def evaluate_category(self, df: pd.DataFrame, category: str) -> Dict:
+    def build_consensus_table(self, df: pd.DataFrame) -> Dict[str, Dict[str, Tuple[str, float, List]]]:
         """
-        Evaluate AI performance for a specific category.
+        Build the consensus for every (category, post) at once.
         
         Args:
             df: DataFrame with evaluations
-            category: Category to evaluate
             
         Returns:
-            Dictionary with performance metrics
+            Dictionary of category -> postId -> (consensus_judgment, confidence,
+            individual_votes), as build_consensus returns them, with each
+            category's posts in their order of appearance
         """
-        category_data = df[df['category'] == category]
-        post_ids = category_data['postId'].unique()
-        
-        correct_count = 0
-        incorrect_count = 0
-        uncertain_count = 0
-        no_data_count = 0
+        # Number each (category, post) pair in order of appearance, so every count
+        # below is a bincount over the pair codes
+        category_codes, category_names = pd.factorize(df['category'], use_na_sentinel=False)
+        post_codes, post_names = pd.factorize(df['postId'], use_na_sentinel=False)
+        pair_codes, pairs = pd.factorize(category_codes * len(post_names) + post_codes)
+        n_pairs = len(pairs)
+        is_correct = df['is_correct'].to_numpy()
+        judged = is_correct != -1
         
-        consensus_details = []
+        # Count votes
+        correct_votes = np.bincount(pair_codes[is_correct == 1], minlength=n_pairs)
+        total_votes = np.bincount(pair_codes[judged], minlength=n_pairs)
+        incorrect_votes = total_votes - correct_votes
+        
+        # Each pair's votes in row order: stable-sort the judged rows by pair and split
+        judged_codes = pair_codes[judged]
+        order = np.argsort(judged_codes, kind='stable')
+        votes = np.split(is_correct[judged][order], np.cumsum(total_votes)[:-1])
+        
+        # Determine consensus (ties are uncertain, with confidence 0.5)
+        consensus = np.select([total_votes == 0, correct_votes > incorrect_votes, incorrect_votes > correct_votes],
+                              ['no_data', 'correct', 'incorrect'], 'uncertain')
+        majority = np.maximum(correct_votes, incorrect_votes) / np.maximum(total_votes, 1)
+        confidence = np.select([total_votes == 0, consensus == 'uncertain'], [0.0, 0.5], majority)
+        
+        table = {}
+        for category_code, post_code, post_consensus, post_confidence, post_votes in zip(
+                pairs // len(post_names), pairs % len(post_names), consensus.tolist(), confidence.tolist(), votes):
+            table.setdefault(category_names[category_code], {})[post_names[post_code]] = (
+                post_consensus, post_confidence, post_votes.tolist())
+        
+        return table
+    
+    def evaluate_category(self, df: pd.DataFrame, category: str,
+                          consensus_table: Optional[Dict[str, Dict[str, Tuple[str, float, List]]]] = None) -> Dict:
+        """
+        Evaluate AI performance for a specific category.
         
-        for post_id in post_ids:
-            consensus, confidence, votes = self.build_consensus(df, category, post_id)
-            
-            if consensus == 'correct':
-                correct_count += 1
-            elif consensus == 'incorrect':
-                incorrect_count += 1
-            elif consensus == 'uncertain':
-                uncertain_count += 1
-            else:
-                no_data_count += 1
+        Args:
+            df: DataFrame with evaluations
+            category: Category to evaluate
+            consensus_table: Optional table from build_consensus_table, so the
+                posts' consensus is looked up rather than rebuilt one post at a time
             
-            consensus_details.append({
-                'postId': post_id,
-                'consensus': consensus,
-                'confidence': round(confidence, 4),
-                'votes': votes
-            })
+        Returns:
+            Dictionary with performance metrics
+        """
+        if consensus_table is None:
+            category_data = df[df['category'] == category]
+            post_ids = category_data['postId'].unique()
+            post_consensus = [self.build_consensus(df, category, post_id) for post_id in post_ids]
+        else:
+            # The table already lists the category's posts, so the frame is not rescanned
+            category_consensus = consensus_table.get(category, {})
+            post_ids = list(category_consensus)
+            post_consensus = list(category_consensus.values())
+        
+        consensus_details = [{
+            'postId': post_id,
+            'consensus': consensus,
+            'confidence': round(confidence, 4),
+            'votes': votes
+        } for post_id, (consensus, confidence, votes) in zip(post_ids, post_consensus)]
+        
+        # Tally the consensus labels in one pass
+        counts = Counter(consensus for consensus, _, _ in post_consensus)
+        correct_count = counts['correct']
+        incorrect_count = counts['incorrect']
+        uncertain_count = counts['uncertain']
+        no_data_count = len(post_consensus) - correct_count - incorrect_count - uncertain_count
         
         # Calculate metrics
         total_evaluated = correct_count + incorrect_count
@@ -187,18 +274,31 @@ class ModelEvaluator:
             'consensus_details': consensus_details
         }
     
-    def evaluate_model(self, feedback_files: List[str]) -> Dict:
+    def evaluate_model(self, feedback_files: List[Union[str, IO]]) -> Dict:
         """
         Main method to evaluate AI model performance.
         
         Args:
-            feedback_files: List of paths to feedback JSON files
+            feedback_files: List of paths or file-like objects for feedback JSON files
+            
+        Returns:
+            Dictionary with comprehensive evaluation results
+        """
+        records = self.load_feedback_files(feedback_files)
+        return self.evaluate_model_from_records(records)
+    
+    def evaluate_model_from_records(self, records: List[Dict]) -> Dict:
+        """
+        Evaluate AI model performance from already-parsed feedback JSON.
+        
+        Args:
+            records: List of parsed feedback JSON documents (one per annotator)
             
         Returns:
             Dictionary with comprehensive evaluation results
         """
         # Extract all evaluations
-        df = self.extract_evaluations(feedback_files)
+        df = self.extract_evaluations_from_records(records)
         
         # Get number of annotators
         n_annotators = df['annotator'].nunique()
@@ -212,11 +312,12 @@ class ModelEvaluator:
         print(f"Categories evaluated: {', '.join(self.feedback_categories)}")
         print(f"{'='*70}\n")
         
-        # Evaluate each category
+        # Evaluate each category, from one consensus pass over all of them
+        consensus_table = self.build_consensus_table(df)
         category_results = {}
         for category in self.feedback_categories:
             print(f"Evaluating {category}...")
-            category_results[category] = self.evaluate_category(df, category)
+            category_results[category] = self.evaluate_category(df, category, consensus_table)
         
         # Calculate overall metrics
         total_correct = sum(r['correct'] for r in category_results.values())
@@ -246,40 +347,43 @@ class ModelEvaluator:
     
     def print_results(self, results: Dict):
         """Print formatted evaluation results."""
-        print(f"\n{'='*70}")
-        print(f"EVALUATION RESULTS")
-        print(f"{'='*70}\n")
-        
-        print("Category-wise Performance:")
-        print("-" * 70)
-        print(f"{'Category':<20} {'Correct':<10} {'Wrong':<10} {'Uncertain':<10} {'Accuracy':<10}")
-        print("-" * 70)
-        
-        for category, metrics in results['category_results'].items():
-            accuracy_pct = metrics['accuracy'] * 100
-            print(f"{category:<20} {metrics['correct']:<10} {metrics['incorrect']:<10} "
-                  f"{metrics['uncertain']:<10} {accuracy_pct:>6.2f}%")
+        # Build the whole report, then write it in one go
+        lines = [
+            f"\n{'='*70}",
+            f"EVALUATION RESULTS",
+            f"{'='*70}\n",
+            "Category-wise Performance:",
+            "-" * 70,
+            f"{'Category':<20} {'Correct':<10} {'Wrong':<10} {'Uncertain':<10} {'Accuracy':<10}",
+            "-" * 70
+        ]
+        lines += [
+            f"{category:<20} {metrics['correct']:<10} {metrics['incorrect']:<10} "
+            f"{metrics['uncertain']:<10} {metrics['accuracy'] * 100:>6.2f}%"
+            for category, metrics in results['category_results'].items()
+        ]
         
-        print("\n" + "=" * 70)
-        print("OVERALL MODEL PERFORMANCE")
-        print("=" * 70)
         overall = results['overall_metrics']
-        print(f"Total Evaluations:  {overall['total_evaluated']}")
-        print(f"Correct:            {overall['total_correct']}")
-        print(f"Incorrect:          {overall['total_incorrect']}")
-        print(f"Uncertain:          {overall['total_uncertain']}")
-        print(f"\nOverall Accuracy:   {overall['overall_accuracy']*100:.2f}%")
-        print(f"Overall Error Rate: {overall['overall_error_rate']*100:.2f}%")
-        print("=" * 70)
+        lines += [
+            "\n" + "=" * 70,
+            "OVERALL MODEL PERFORMANCE",
+            "=" * 70,
+            f"Total Evaluations:  {overall['total_evaluated']}",
+            f"Correct:            {overall['total_correct']}",
+            f"Incorrect:          {overall['total_incorrect']}",
+            f"Uncertain:          {overall['total_uncertain']}",
+            f"\nOverall Accuracy:   {overall['overall_accuracy']*100:.2f}%",
+            f"Overall Error Rate: {overall['overall_error_rate']*100:.2f}%",
+            "=" * 70
+        ]
         
         # Provide insights
-        self._print_insights(results)
+        lines += self._insight_lines(results)
+        sys.stdout.write("\n".join(lines) + "\n")
     
-    def _print_insights(self, results: Dict):
-        """Print insights and recommendations based on results."""
-        print(f"\n{'='*70}")
-        print("INSIGHTS & RECOMMENDATIONS")
-        print("=" * 70)
+    def _insight_lines(self, results: Dict) -> List[str]:
+        """Lines of the insights and recommendations printed for the results."""
+        lines = [f"\n{'='*70}", "INSIGHTS & RECOMMENDATIONS", "=" * 70]
         
         # Find best and worst performing categories
         category_accuracies = {
@@ -292,75 +396,114 @@ class ModelEvaluator:
             best_category = max(category_accuracies, key=category_accuracies.get)
             worst_category = min(category_accuracies, key=category_accuracies.get)
             
-            print(f"\n✅ STRONGEST AREA:")
-            print(f"   {best_category}: {category_accuracies[best_category]*100:.1f}% accuracy")
-            
-            print(f"\n⚠️  NEEDS IMPROVEMENT:")
-            print(f"   {worst_category}: {category_accuracies[worst_category]*100:.1f}% accuracy")
+            lines += [
+                f"\n✅ STRONGEST AREA:",
+                f"   {best_category}: {category_accuracies[best_category]*100:.1f}% accuracy",
+                f"\n⚠️  NEEDS IMPROVEMENT:",
+                f"   {worst_category}: {category_accuracies[worst_category]*100:.1f}% accuracy"
+            ]
             
             # Overall assessment
             overall_acc = results['overall_metrics']['overall_accuracy']
             if overall_acc >= 0.9:
-                print(f"\n🎉 EXCELLENT: Model shows outstanding performance (>90% accuracy)")
+                lines.append(f"\n🎉 EXCELLENT: Model shows outstanding performance (>90% accuracy)")
             elif overall_acc >= 0.8:
-                print(f"\n✅ GOOD: Model shows strong performance (80-90% accuracy)")
+                lines.append(f"\n✅ GOOD: Model shows strong performance (80-90% accuracy)")
             elif overall_acc >= 0.7:
-                print(f"\n⚠️  FAIR: Model shows acceptable performance (70-80% accuracy)")
+                lines.append(f"\n⚠️  FAIR: Model shows acceptable performance (70-80% accuracy)")
             else:
-                print(f"\n❌ POOR: Model needs significant improvement (<70% accuracy)")
+                lines.append(f"\n❌ POOR: Model needs significant improvement (<70% accuracy)")
             
             # Sample size warning
             n_posts = results['n_posts']
             if n_posts < 30:
-                print(f"\n⚠️  WARNING: Sample size ({n_posts} posts) is too small for robust conclusions.")
-                print(f"   Recommendation: Collect at least 100 posts for reliable statistics.")
+                lines += [
+                    f"\n⚠️  WARNING: Sample size ({n_posts} posts) is too small for robust conclusions.",
+                    f"   Recommendation: Collect at least 100 posts for reliable statistics."
+                ]
         
-        print("=" * 70 + "\n")
+        lines.append("=" * 70 + "\n")
+        return lines
     
     def export_results(self, results: Dict, output_path: str):
         """Export evaluation results to JSON file."""
-        export_data = {
+        _write_json(self._summary_payload(results), output_path)
+        
+        print(f"✅ Results exported to: {output_path}")
+    
+    def export_detailed_report(self, results: Dict, output_path: str):
+        """Export detailed per-post evaluation report."""
+        _write_json(self._detail_payload(results), output_path)
+        
+        print(f"📊 Detailed report exported to: {output_path}")
+    
+    def _summary_payload(self, results: Dict, category_summaries: Optional[Dict] = None) -> Dict:
+        """Summary written by export_results, without the per-post consensus details."""
+        if category_summaries is None:
+            category_summaries = {
+                category: self._category_summary(metrics)
+                for category, metrics in results['category_results'].items()
+            }
+        return {
             'n_annotators': results['n_annotators'],
             'n_posts': results['n_posts'],
-            'category_results': {},
+            'category_results': category_summaries,
             'overall_metrics': results['overall_metrics']
         }
+    
+    def _category_summary(self, metrics: Dict) -> Dict:
+        """One category's entry in the summary export."""
+        return {
+            'correct': metrics['correct'],
+            'incorrect': metrics['incorrect'],
+            'uncertain': metrics['uncertain'],
+            'total_evaluated': metrics['total_evaluated'],
+            'accuracy': metrics['accuracy'],
+            'error_rate': metrics['error_rate']
+        }
+    
+    def _detail_payload(self, results: Dict) -> List[Dict]:
+        """Per-post rows written by export_detailed_report, category by category."""
+        return [row for category, metrics in results['category_results'].items()
+                for row in self._detail_rows(category, metrics)]
+    
+    def _detail_rows(self, category: str, metrics: Dict) -> List[Dict]:
+        """One category's rows in the detailed per-post report."""
+        return [{
+            'category': category,
+            'postId': detail['postId'],
+            'consensus': detail['consensus'],
+            'confidence': detail['confidence'],
+            'n_votes': len(detail['votes']),
+            'votes': detail['votes']
+        } for detail in metrics['consensus_details']]
+    
+    def build_export_payloads(self, results: Dict) -> Tuple[Dict, List[Dict]]:
+        """
+        Build the summary and detailed-report payloads for export_all in one
+        pass over the category results.
         
-        # Export category results (without raw consensus details for cleaner output)
+        Returns:
+            Tuple of (summary dict as written by export_results,
+            detail rows as written by export_detailed_report)
+        """
+        category_summaries = {}
+        details = []
         for category, metrics in results['category_results'].items():
-            export_data['category_results'][category] = {
-                'correct': metrics['correct'],
-                'incorrect': metrics['incorrect'],
-                'uncertain': metrics['uncertain'],
-                'total_evaluated': metrics['total_evaluated'],
-                'accuracy': metrics['accuracy'],
-                'error_rate': metrics['error_rate']
-            }
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(export_data, f, indent=2, ensure_ascii=False)
+            category_summaries[category] = self._category_summary(metrics)
+            details.extend(self._detail_rows(category, metrics))
         
-        print(f"✅ Results exported to: {output_path}")
+        return self._summary_payload(results, category_summaries), details
     
-    def export_detailed_report(self, results: Dict, output_path: str):
-        """Export detailed per-post evaluation report."""
-        detailed_data = []
-        
-        for category, metrics in results['category_results'].items():
-            for detail in metrics['consensus_details']:
-                detailed_data.append({
-                    'category': category,
-                    'postId': detail['postId'],
-                    'consensus': detail['consensus'],
-                    'confidence': detail['confidence'],
-                    'n_votes': len(detail['votes']),
-                    'votes': detail['votes']
-                })
+    def export_all(self, results: Dict, summary_path: str, detail_path: str):
+        """Export the summary and the detailed per-post report from a single pass."""
+        summary, details = self.build_export_payloads(results)
         
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(detailed_data, f, indent=2, ensure_ascii=False)
+        _write_json(summary, summary_path)
+        print(f"✅ Results exported to: {summary_path}")
         
-        print(f"📊 Detailed report exported to: {output_path}")
+        _write_json(details, detail_path)
+        print(f"📊 Detailed report exported to: {detail_path}")
     
     def identify_problem_posts(self, results: Dict) -> List[Dict]:
         """
@@ -372,30 +515,33 @@ class ModelEvaluator:
         df = results['raw_data']
         post_ids = df['postId'].unique()
         
-        problem_posts = []
+        # Tally per-post errors from the consensus evaluate_category already built
+        position = {post_id: i for i, post_id in enumerate(post_ids)}
+        errors = np.zeros(len(post_ids), dtype=np.int32)
+        totals = np.zeros(len(post_ids), dtype=np.int32)
         
-        for post_id in post_ids:
-            errors_in_post = 0
-            total_categories = 0
-            
-            for category in self.feedback_categories:
-                consensus, _, _ = self.build_consensus(df, category, post_id)
-                if consensus == 'incorrect':
-                    errors_in_post += 1
-                if consensus in ['correct', 'incorrect']:
-                    total_categories += 1
-            
-            if total_categories > 0:
-                error_rate = errors_in_post / total_categories
-                if error_rate > 0.5:  # More than 50% errors
-                    problem_posts.append({
-                        'postId': post_id,
-                        'errors': errors_in_post,
-                        'total': total_categories,
-                        'error_rate': round(error_rate, 4)
-                    })
-        
-        return sorted(problem_posts, key=lambda x: x['error_rate'], reverse=True)
+        for category in self.feedback_categories:
+            for detail in results['category_results'][category]['consensus_details']:
+                if detail['consensus'] == 'incorrect':
+                    errors[position[detail['postId']]] += 1
+                    totals[position[detail['postId']]] += 1
+                elif detail['consensus'] == 'correct':
+                    totals[position[detail['postId']]] += 1
+        
+        rates = errors / np.maximum(totals, 1)
+        flagged = np.flatnonzero((totals > 0) & (rates > 0.5))  # More than 50% errors
+        
+        error_rates = [round(float(rate), 4) for rate in rates[flagged]]
+        
+        # Worst first, ordered before any record is built; the stable sort keeps
+        # post order among equal rates
+        order = np.argsort(-np.array(error_rates, dtype=float), kind='stable')
+        return [{
+            'postId': post_ids[flagged[k]],
+            'errors': int(errors[flagged[k]]),
+            'total': int(totals[flagged[k]]),
+            'error_rate': error_rates[k]
+        } for k in order]
 
 
 def main():
@@ -431,8 +577,7 @@ def main():
     evaluator.print_results(results)
     
     # Export results
-    evaluator.export_results(results, 'model_evaluation.json')
-    evaluator.export_detailed_report(results, 'evaluation_details.json')
+    evaluator.export_all(results, 'model_evaluation.json', 'evaluation_details.json')
     
     # Identify problem posts
     problem_posts = evaluator.identify_problem_posts(results)